@@ -0,0 +1,129 @@
+"""Compare per-ID and batched premium lookups, and pool sizes under load.
+
+Run from the repository root with ``uv run python -m benchmarks.db``. By default
+queries go to an in-process stand-in pool that answers after a fixed round-trip
+delay; pass ``--mysql`` to run against the database configured in ``.env``
+(e.g. a local MySQL/MariaDB container with the bot's schema).
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+import random
+import asyncio
+import contextlib
+
+from utils.db import is_premium_user, is_premium_users
+
+USERS = 1000
+PREMIUM_RATIO = 0.1
+CONCURRENCY = 200
+ROUND_TRIP = 0.0005
+
+
+class StandInCursor:
+    def __init__(self, premium: set[int]):
+        self._premium = premium
+        self._rows: list[tuple] = list()
+
+    async def __aenter__(self) -> StandInCursor:
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        pass
+
+    async def execute(self, query: str, args=None) -> int:
+        await asyncio.sleep(ROUND_TRIP)
+
+        if " in (" in query:
+            self._rows = [(user_id,) for user_id in args if user_id in self._premium]
+
+        else:
+            self._rows = [(int(args[0] in self._premium),)]
+
+        return len(self._rows)
+
+    async def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    async def fetchall(self):
+        return self._rows
+
+
+class StandInPool:
+    """Just enough of :class:`aiomysql.Pool` for the premium lookups."""
+
+    def __init__(self, premium: set[int], maxsize: int = 10):
+        self._premium = premium
+        self._slots = asyncio.Semaphore(maxsize)
+
+    @contextlib.asynccontextmanager
+    async def acquire(self):
+        async with self._slots:
+            yield self
+
+    def cursor(self) -> StandInCursor:
+        return StandInCursor(self._premium)
+
+
+async def timed(coro) -> float:
+    start = time.perf_counter()
+    await coro
+
+    return time.perf_counter() - start
+
+
+async def lookups(pool, user_ids: list[int]) -> None:
+    print(f"{USERS} premium lookups")
+
+    async def per_id():
+        for user_id in user_ids:
+            await is_premium_user(pool, user_id)
+
+    for name, coro in (
+        ("is_premium_user loop", per_id()),
+        ("is_premium_users", is_premium_users(pool, user_ids)),
+    ):
+        print(f"  {name:<22} {await timed(coro) * 1000:9.1f} ms")
+
+
+async def concurrency(user_ids: list[int], premium: set[int]) -> None:
+    print(f"{CONCURRENCY} concurrent is_premium_user calls")
+
+    for maxsize in (1, 5, 10, 20):
+        pool = StandInPool(premium, maxsize=maxsize)
+        elapsed = await timed(
+            asyncio.gather(
+                *(
+                    is_premium_user(pool, user_id)
+                    for user_id in user_ids[:CONCURRENCY]
+                )
+            )
+        )
+        print(f"  maxsize {maxsize:<3} {elapsed * 1000:9.1f} ms")
+
+
+async def main() -> None:
+    user_ids = random.sample(range(10**17, 10**18), USERS)
+    premium = set(random.sample(user_ids, int(USERS * PREMIUM_RATIO)))
+
+    if "--mysql" in sys.argv:
+        from launcher import create_pool
+
+        pool = await create_pool()
+
+        try:
+            await lookups(pool, user_ids)
+
+        finally:
+            pool.close()
+            await pool.wait_closed()
+
+    else:
+        await lookups(StandInPool(premium), user_ids)
+        await concurrency(user_ids, premium)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+"""Compare per-track ``put_wait`` against ``Player.enqueue`` for a large playlist.
+
+Run from the repository root with ``uv run python -m benchmarks.enqueue``.
+"""
+
+from __future__ import annotations
+
+import time
+import asyncio
+from types import SimpleNamespace
+
+import wavelink
+
+from utils.player import Player
+
+TRACKS = 1000
+ROUNDS = 20
+
+
+def make_tracks(count: int) -> list[wavelink.Playable]:
+    return [
+        wavelink.Playable(
+            {
+                "encoded": f"encoded-{index}",
+                "info": {
+                    "identifier": f"id-{index}",
+                    "isSeekable": True,
+                    "author": "Author",
+                    "length": 180_000,
+                    "isStream": False,
+                    "position": 0,
+                    "title": f"Track {index}",
+                    "sourceName": "youtube",
+                },
+                "pluginInfo": {},
+            }
+        )
+        for index in range(count)
+    ]
+
+
+async def per_track(tracks: list[wavelink.Playable]) -> float:
+    queue = wavelink.Queue()
+    start = time.perf_counter()
+
+    for track in tracks:
+        track.extras = {"requester_id": 1}
+        await queue.put_wait(track)
+
+    return time.perf_counter() - start
+
+
+async def batched(tracks: list[wavelink.Playable]) -> float:
+    # Just the attributes Player.enqueue touches; nothing is playing, so the
+    # prefetcher is never asked to look ahead.
+    player = SimpleNamespace(
+        queue=wavelink.Queue(),
+        playing=False,
+        prefetcher=SimpleNamespace(schedule=lambda: None),
+    )
+    start = time.perf_counter()
+
+    Player.enqueue(player, tracks, requester_id=1)
+
+    return time.perf_counter() - start
+
+
+async def main() -> None:
+    tracks = make_tracks(TRACKS)
+
+    for name, func in (("put_wait loop", per_track), ("Player.enqueue", batched)):
+        timings = [await func(tracks) for _ in range(ROUNDS)]
+        print(
+            f"{name:<16} best {min(timings) * 1000:8.3f} ms  "
+            f"mean {sum(timings) / ROUNDS * 1000:8.3f} ms  ({TRACKS} tracks)"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
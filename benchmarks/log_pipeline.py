@@ -0,0 +1,97 @@
+"""Measure the per-record cost of ``log.info`` on the calling (event loop) thread.
+
+Compares handlers attached directly to the root logger, as ``setup_logging``
+used to do, with the ``QueueHandler``/``QueueListener`` pipeline. Run from the
+repository root with ``uv run python -m benchmarks.log_pipeline``.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import asyncio
+import logging
+import tempfile
+import statistics
+from time import perf_counter_ns
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+RECORDS = 20_000
+
+
+def make_handlers(directory: str) -> list[logging.Handler]:
+    formatter = logging.Formatter(
+        "[{asctime}] [{levelname:<8}] {name}: {message}", style="{"
+    )
+
+    stream_handler = logging.StreamHandler(open(os.devnull, "w"))
+    file_handler = RotatingFileHandler(
+        os.path.join(directory, "bench.log"),
+        maxBytes=32 * 1024 * 1024,
+        backupCount=1,
+        encoding="utf-8",
+    )
+
+    for handler in (stream_handler, file_handler):
+        handler.setFormatter(formatter)
+
+    return [stream_handler, file_handler]
+
+
+async def measure(log: logging.Logger) -> list[int]:
+    timings = list()
+
+    for index in range(RECORDS):
+        start = perf_counter_ns()
+        log.info("Dispatched event %s for guild %s", "track_end", index)
+        timings.append(perf_counter_ns() - start)
+
+        if index % 100 == 0:
+            await asyncio.sleep(0)
+
+    return timings
+
+
+def report(name: str, timings: list[int]) -> None:
+    timings.sort()
+    print(
+        f"{name:<8} mean {statistics.fmean(timings) / 1000:7.2f} us  "
+        f"p50 {timings[len(timings) // 2] / 1000:7.2f} us  "
+        f"p99 {timings[int(len(timings) * 0.99)] / 1000:7.2f} us"
+    )
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        log = logging.getLogger("bench.direct")
+        log.propagate = False
+        log.setLevel(logging.INFO)
+
+        handlers = make_handlers(directory)
+        for handler in handlers:
+            log.addHandler(handler)
+
+        report("direct", await measure(log))
+
+        for handler in handlers:
+            handler.close()
+
+        log = logging.getLogger("bench.queued")
+        log.propagate = False
+        log.setLevel(logging.INFO)
+
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        handlers = make_handlers(directory)
+        listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        log.addHandler(QueueHandler(log_queue))
+        listener.start()
+
+        report("queued", await measure(log))
+
+        listener.stop()
+        for handler in handlers:
+            handler.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,186 @@
+"""Compare member cache memory with the default and low-memory cache policies.
+
+Run from the repository root with ``uv run python -m benchmarks.memory``. A
+synthetic large guild (every member chunked in, a share of them online with an
+activity and a few in voice) is loaded into a discord.py connection state with
+each policy, then a burst of presence updates is replayed against it.
+"""
+
+from __future__ import annotations
+
+import gc
+import time
+import random
+import tracemalloc
+
+import discord
+from discord.state import ConnectionState
+
+GUILD_ID = 1 << 40
+VOICE_CHANNEL_ID = GUILD_ID + 1
+
+MEMBERS = 100_000
+ONLINE_RATIO = 0.2
+IN_VOICE = 200
+PRESENCE_UPDATES = 20_000
+
+
+def make_user(user_id: int) -> dict:
+    return {
+        "id": str(user_id),
+        "username": f"user{user_id}",
+        "discriminator": "0",
+        "global_name": None,
+        "avatar": None,
+    }
+
+
+def make_presence(user_id: int) -> dict:
+    return {
+        "user": {"id": str(user_id)},
+        "guild_id": str(GUILD_ID),
+        "status": "online",
+        "client_status": {"desktop": "online"},
+        "activities": [
+            {
+                "type": 2,
+                "name": "Spotify",
+                "details": f"Track {user_id}",
+                "state": "Artist",
+                "created_at": 0,
+                "timestamps": {"start": 0, "end": 180_000},
+            }
+        ],
+    }
+
+
+def make_guild() -> dict:
+    member_ids = [GUILD_ID + 100 + index for index in range(MEMBERS)]
+    online = random.sample(member_ids, int(MEMBERS * ONLINE_RATIO))
+
+    return {
+        "id": str(GUILD_ID),
+        "name": "Synthetic",
+        "member_count": MEMBERS,
+        "roles": [
+            {
+                "id": str(GUILD_ID),
+                "name": "@everyone",
+                "permissions": "0",
+                "position": 0,
+                "color": 0,
+                "hoist": False,
+                "managed": False,
+                "mentionable": False,
+            }
+        ],
+        "channels": [
+            {
+                "id": str(VOICE_CHANNEL_ID),
+                "type": 2,
+                "name": "Music",
+                "position": 0,
+                "permission_overwrites": [],
+                "bitrate": 64000,
+                "user_limit": 0,
+                "parent_id": None,
+            }
+        ],
+        "members": [
+            {
+                "user": make_user(user_id),
+                "roles": [],
+                "joined_at": "2020-01-01T00:00:00+00:00",
+                "deaf": False,
+                "mute": False,
+                "flags": 0,
+            }
+            for user_id in member_ids
+        ],
+        "voice_states": [
+            {
+                "user_id": str(user_id),
+                "channel_id": str(VOICE_CHANNEL_ID),
+                "session_id": "session",
+                "deaf": False,
+                "mute": False,
+                "self_deaf": False,
+                "self_mute": False,
+                "self_video": False,
+                "suppress": False,
+                "request_to_speak_timestamp": None,
+            }
+            for user_id in member_ids[:IN_VOICE]
+        ],
+        "presences": [make_presence(user_id) for user_id in online],
+    }
+
+
+def make_state(low_memory: bool) -> ConnectionState:
+    intents = discord.Intents.default()
+    intents.presences = True
+    intents.members = True
+
+    if low_memory:
+        flags = discord.MemberCacheFlags.none()
+        flags.voice = True
+
+    else:
+        flags = discord.MemberCacheFlags.from_intents(intents)
+
+    # noinspection PyTypeChecker
+    return ConnectionState(
+        dispatch=lambda *_: None,
+        handlers={},
+        hooks={},
+        http=None,
+        intents=intents,
+        member_cache_flags=flags,
+        chunk_guilds_at_startup=not low_memory,
+    )
+
+
+def measure(payload: dict, updates: list[dict], low_memory: bool) -> None:
+    gc.collect()
+    tracemalloc.start()
+
+    state = make_state(low_memory)
+    guild = discord.Guild(data=payload, state=state)
+    state._add_guild(guild)
+
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+
+    for update in updates:
+        state.parse_presence_update(update)
+
+    elapsed = time.perf_counter() - start
+
+    name = "low memory" if low_memory else "default"
+    print(
+        f"  {name:<11} {len(guild.members):>7} members cached "
+        f"{retained / 1024 / 1024:8.1f} MiB "
+        f"{elapsed / len(updates) * 1_000_000:6.1f} µs per presence update"
+    )
+
+
+def main() -> None:
+    payload = make_guild()
+    updates = [
+        make_presence(GUILD_ID + 100 + random.randrange(MEMBERS))
+        for _ in range(PRESENCE_UPDATES)
+    ]
+
+    print(
+        f"{MEMBERS} members, {int(MEMBERS * ONLINE_RATIO)} online, {IN_VOICE} in voice"
+    )
+
+    for low_memory in (False, True):
+        measure(payload, updates, low_memory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Measure player snapshot passes and snapshot loading per thousand guilds.
+
+Run from the repository root with ``uv run python -m benchmarks.snapshots``.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+import asyncio
+import tempfile
+from types import SimpleNamespace
+
+import wavelink
+
+from utils.player import Queue
+from utils.snapshots import SnapshotStore
+from benchmarks.enqueue import make_tracks
+
+GUILDS = 1000
+QUEUE_LENGTH = 50
+
+
+def make_queue(tracks: list[wavelink.Playable]) -> Queue:
+    queue = Queue()
+    queue.put(tracks)
+
+    return queue
+
+
+def make_players(count: int) -> list[SimpleNamespace]:
+    tracks = make_tracks(QUEUE_LENGTH + 1)
+
+    for track in tracks:
+        track.extras = {"requester_id": 1}
+
+    return [
+        SimpleNamespace(
+            guild=SimpleNamespace(id=index),
+            channel=SimpleNamespace(id=index),
+            ctx=SimpleNamespace(channel=SimpleNamespace(id=index)),
+            dj=SimpleNamespace(id=1),
+            connected=True,
+            loop=False,
+            loop_queue=False,
+            volume=100,
+            paused=False,
+            position=60_000,
+            current=tracks[0],
+            queue=make_queue(tracks[1:]),
+            filters=wavelink.Filters(),
+        )
+        for index in range(count)
+    ]
+
+
+async def timed(coro) -> float:
+    start = time.perf_counter()
+    await coro
+
+    return time.perf_counter() - start
+
+
+async def main() -> None:
+    players = make_players(GUILDS)
+    per_thousand = 1000 / GUILDS * 1000
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "players.jsonl")
+        store = SnapshotStore(path=path)
+
+        first = await timed(store.snapshot(players))
+        unchanged = await timed(store.snapshot(players))
+
+        for player in players[: GUILDS // 10]:
+            player.volume = 50
+
+        tenth = await timed(store.snapshot(players))
+        size = os.path.getsize(path)
+
+        load = await timed(SnapshotStore(path=path).load())
+
+    print(
+        f"{GUILDS} guilds, {QUEUE_LENGTH} queued tracks each, {size / 1024:.0f} KiB"
+    )
+
+    for name, elapsed in (
+        ("first pass", first),
+        ("unchanged pass", unchanged),
+        ("10% changed pass", tenth),
+        ("load", load),
+    ):
+        print(f"{name:<18} {elapsed * per_thousand:8.1f} ms per 1000 guilds")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Optional
 
+import time
+import asyncio
 import logging
 from datetime import datetime
 from itertools import cycle
@@ -18,15 +20,126 @@ from discord.app_commands import CommandTree
 
 from utils.db import (
     add_guild,
-    guild_exists,
-    is_blacklisted_guild,
+    add_guilds,
+    check_health,
+    get_guild_ids,
+    get_premium_users,
     get_blacklisted_users,
     get_blacklisted_guilds,
+    get_user_blacklist_state,
+    get_guild_blacklist_state,
+    get_blacklisted_users_since,
+    get_blacklisted_guilds_since,
 )
+from utils.cache import TTLCache
+from utils.nodes import NodeScheduler
 from utils.config import Config
+from utils.player import Player
+from utils.search import SearchCache
+from utils.cluster import ClusterInfo, ClusterStats
+from utils.logsink import ErrorSink
+from utils.metrics import MetricsServer, registry
+from utils.watchdog import LoopWatchdog
+from utils.blacklist import BlacklistSync
+from utils.snapshots import (
+    SnapshotStore,
+    RestoredContext,
+    load_track,
+    resume_position,
+)
+
+COMMAND_LATENCY = registry.histogram(
+    "fumetune_command_latency_seconds",
+    "Time taken to handle an application command, by command.",
+    labels=("command",),
+)
+WAVELINK_EVENTS = registry.counter(
+    "fumetune_wavelink_events_total",
+    "Lavalink events dispatched, by event.",
+    labels=("event",),
+)
+WEBHOOK_FAILURES = registry.counter(
+    "fumetune_webhook_failures_total",
+    "Error digests that could not be sent to the webhook.",
+)
+NODE_UP = registry.gauge(
+    "fumetune_node_up",
+    "Whether a Lavalink node is connected, by node.",
+    labels=("node",),
+)
+PLAYERS = registry.gauge(
+    "fumetune_players",
+    "Connected players, by Lavalink node.",
+    labels=("node",),
+)
+QUEUE_LENGTHS = registry.gauge(
+    "fumetune_players_by_queue_length",
+    "Connected players with at most le queued tracks.",
+    labels=("le",),
+)
+DB_POOL = registry.gauge(
+    "fumetune_db_pool_connections",
+    "MySQL pool connections, by state (size or free).",
+    labels=("state",),
+)
+DB_UP = registry.gauge(
+    "fumetune_db_up",
+    "Whether the last MySQL health check succeeded.",
+)
+DB_PING = registry.gauge(
+    "fumetune_db_ping_seconds",
+    "Round-trip time of the last successful MySQL health check.",
+)
+
+_QUEUE_LENGTH_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+def _extension_waves(
+    extensions: list[str], dependencies: dict[str, tuple[str, ...]]
+) -> list[list[str]]:
+    """Group ``extensions`` into waves that only depend on earlier waves."""
+    remaining = list(extensions)
+    loaded: set[str] = set()
+    waves = list()
+
+    while remaining:
+        wave = [
+            extension
+            for extension in remaining
+            if all(
+                dependency in loaded or dependency not in extensions
+                for dependency in dependencies.get(extension, ())
+            )
+        ] or remaining  # Whatever is left is a cycle; load it in configured order.
+
+        waves.append(wave)
+        loaded.update(wave)
+        remaining = [extension for extension in remaining if extension not in loaded]
+
+    return waves
 
 
 class FumeTree(CommandTree):
+    async def _call(self, interaction: discord.Interaction) -> None:
+        start = time.perf_counter()
+
+        if self.client.config.LOW_MEMORY_MODE and isinstance(
+            interaction.user, discord.Member
+        ):
+            self.client.recent_members.set(
+                (interaction.user.guild.id, interaction.user.id), interaction.user
+            )
+
+        try:
+            await super()._call(interaction)
+
+        finally:
+            command = interaction.command
+            COMMAND_LATENCY.observe(
+                time.perf_counter() - start,
+                command=command.qualified_name if command else "unknown",
+            )
+
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
         if (
             interaction.guild
@@ -71,59 +184,225 @@ class FumeTune(commands.AutoShardedBot):
     pool: aiomysql.Pool
     topggpy: topgg.DBLClient
     ipc: Server
+    error_sink: ErrorSink
+    watchdog: LoopWatchdog
     log: logging.Logger
 
-    def __init__(self):
+    # Extensions that have to be loaded before the given one; the rest are loaded
+    # concurrently. The IPC server answers the dashboard (and other clusters) as
+    # soon as it starts, so it waits until the music commands are in place.
+    extension_dependencies: dict[str, tuple[str, ...]] = {
+        "cogs.__ipc__": ("cogs.music",),
+    }
+
+    def __init__(
+        self,
+        cluster: Optional[ClusterInfo] = None,
+        cluster_stats: Optional[ClusterStats] = None,
+    ):
         description = "Unlock the ultimate music experience for YOUR Discord community with FumeTune!"
 
         intents = discord.Intents.default()
         intents.presences = True
         intents.members = True
 
+        if Config.LOW_MEMORY_MODE:
+            # Members seen in interactions are kept in recent_members instead.
+            member_cache_flags = discord.MemberCacheFlags.none()
+            member_cache_flags.voice = True
+
+        else:
+            member_cache_flags = discord.MemberCacheFlags.from_intents(intents)
+
         # noinspection PyTypeChecker
         super().__init__(
             command_prefix=commands.when_mentioned,
             description=description,
             heartbeat_timeout=180.0,
             intents=intents,
+            member_cache_flags=member_cache_flags,
+            chunk_guilds_at_startup=not Config.LOW_MEMORY_MODE,
             help_command=None,
             tree_cls=FumeTree,
+            shard_ids=cluster.shard_ids if cluster else None,
+            shard_count=cluster.shard_count if cluster else None,
         )
 
+        # Set when running as one of several cluster processes (see launcher.py).
+        self.cluster: Optional[ClusterInfo] = cluster
+        self.cluster_stats: Optional[ClusterStats] = cluster_stats
+
+        self.metrics: Optional[MetricsServer] = None
+
+        # Global app command count, set by /sync (and fetched once over IPC).
+        self.app_command_count: Optional[int] = None
+
+        # Clusters each keep their own on-disk state.
+        suffix = f"-{cluster.id}" if cluster else ""
+
         self._launch_time: datetime = Any
         self._status_items: cycle = Any
 
-        self.blacklisted_users: set[int] = set()
-        self.blacklisted_guilds: set[int] = set()
+        self._user_blacklist: BlacklistSync = BlacklistSync(
+            fetch_all=get_blacklisted_users,
+            fetch_since=get_blacklisted_users_since,
+            fetch_state=get_user_blacklist_state,
+        )
+        self._guild_blacklist: BlacklistSync = BlacklistSync(
+            fetch_all=get_blacklisted_guilds,
+            fetch_since=get_blacklisted_guilds_since,
+            fetch_state=get_guild_blacklist_state,
+        )
+
+        # These are the sync objects' own sets, updated in place on every sync.
+        self.blacklisted_users: set[int] = self._user_blacklist.ids
+        self.blacklisted_guilds: set[int] = self._guild_blacklist.ids
+
+        self.premium_cache: TTLCache = TTLCache(
+            maxsize=self.config.PREMIUM_CACHE_SIZE, ttl=self.config.PREMIUM_CACHE_TTL
+        )
+        self.recent_members: TTLCache = TTLCache(
+            maxsize=self.config.RECENT_MEMBER_CACHE_SIZE,
+            ttl=self.config.RECENT_MEMBER_CACHE_TTL,
+        )
+        self.node_scheduler: NodeScheduler = NodeScheduler(
+            hysteresis=self.config.NODE_HYSTERESIS
+        )
+        self.search_cache: SearchCache = SearchCache(
+            capacity=self.config.SEARCH_CACHE_SIZE,
+            ttl=self.config.SEARCH_CACHE_TTL,
+            negative_ttl=self.config.SEARCH_CACHE_NEGATIVE_TTL,
+            path=f"data/search-cache{suffix}.json",
+        )
+        self.snapshots: SnapshotStore = SnapshotStore(
+            path=f"data/players{suffix}.jsonl"
+        )
+
+        # Guilds with a snapshot that have not been restored (or given up on) yet.
+        self._pending_restore: set[int] = set()
+        self._restore_started: bool = False
+
+        self._guilds_reconciled: bool = False
+
+        # Set once any music node is ready; see connect_nodes.
+        self.music_ready: asyncio.Event = asyncio.Event()
+        self._node_bootstrap: Optional[asyncio.Task] = None
+        self._node_tasks: dict[str, asyncio.Task] = dict()
 
     async def setup_hook(self) -> None:
-        self.session = aiohttp.ClientSession()
-        self.bot_app_info = await self.application_info()
+        started = time.perf_counter()
+        timings: dict[str, float] = dict()
+
+        async def timed(name: str, coro, into: dict[str, float] = timings) -> None:
+            start = time.perf_counter()
+
+            try:
+                await coro
 
-        await self._refresh_blacklists()
+            finally:
+                into[name] = time.perf_counter() - start
+
+        self.session = aiohttp.ClientSession()
+        self.error_sink = ErrorSink(self)
+        self.error_sink.start()
+
+        # None of these depend on each other; the slowest one sets the pace.
+        await asyncio.gather(
+            timed("application info", self._fetch_application_info()),
+            timed("blacklists", self._refresh_blacklists(full=True)),
+            timed("premium cache", self._warm_premium_cache()),
+            timed("search cache", self._load_search_cache()),
+            timed("snapshots", self._load_snapshots()),
+            timed("metrics", self._start_metrics()),
+        )
 
         self.topggpy = topgg.DBLClient(bot=self, token=self.config.TOPGG_TOKEN)
         # noinspection PyTypeChecker
         self.ipc = Server(
             self,
             secret_key=self.config.IPC_SECRET_KEY,
-            standard_port=self.config.IPC_STANDARD_PORT,
-            multicast_port=self.config.IPC_MULTICAST_PORT,
+            standard_port=self.config.IPC_STANDARD_PORT + self.cluster_id,
+            multicast_port=self.config.IPC_MULTICAST_PORT + self.cluster_id,
         )
 
-        for _extension in self.config.INITIAL_EXTENSIONS:
-            try:
-                await self.load_extension(_extension)
-                self.log.info(f"Loaded extension {_extension}.")
+        extensions_started = time.perf_counter()
+        extension_timings: dict[str, float] = dict()
 
-            except Exception as e:
-                self.log.error(f"Failed to load extension {_extension}.", exc_info=e)
+        for wave in _extension_waves(
+            self.config.INITIAL_EXTENSIONS, self.extension_dependencies
+        ):
+            await asyncio.gather(
+                *(
+                    timed(
+                        _extension,
+                        self._load_initial_extension(_extension),
+                        into=extension_timings,
+                    )
+                    for _extension in wave
+                )
+            )
+
+        timings["extensions"] = time.perf_counter() - extensions_started
+
+        self.log.info(
+            f"Setup took {time.perf_counter() - started:.2f}s ("
+            + ", ".join(
+                f"{name} {elapsed:.2f}s" for name, elapsed in timings.items()
+            )
+            + "); extensions: "
+            + ", ".join(
+                f"{name} {elapsed:.2f}s"
+                for name, elapsed in sorted(
+                    extension_timings.items(), key=lambda item: -item[1]
+                )
+            )
+        )
+
+    async def _fetch_application_info(self) -> None:
+        self.bot_app_info = await self.application_info()
+
+    async def _load_search_cache(self) -> None:
+        try:
+            loaded = await self.search_cache.load()
+            self.log.info(f"Restored {loaded} search cache entries.")
+
+        except Exception as e:
+            self.log.error("Failed to restore the search cache.", exc_info=e)
+
+    async def _load_snapshots(self) -> None:
+        try:
+            self._pending_restore = set(await self.snapshots.load())
+
+        except Exception as e:
+            self.log.error("Failed to load player snapshots.", exc_info=e)
+
+    async def _start_metrics(self) -> None:
+        if not self.config.METRICS_PORT:
+            return
+
+        registry.add_collector(self._collect_metrics)
+
+        self.metrics = MetricsServer(
+            host=self.config.METRICS_HOST,
+            port=self.config.METRICS_PORT + self.cluster_id,
+        )
+        await self.metrics.start()
+
+    async def _load_initial_extension(self, extension: str) -> None:
+        try:
+            await self.load_extension(extension)
+            self.log.info(f"Loaded extension {extension}.")
+
+        except Exception as e:
+            self.log.error(f"Failed to load extension {extension}.", exc_info=e)
 
     @tasks.loop(minutes=30)
     async def _update_status_items(self):
+        counts = await self.get_counts()
+
         self._status_items = cycle(
             [
-                f"on {len(self.guilds)} servers | /help",
+                f"on {counts['guilds']} servers | /help",
                 "/invite | /vote | /community",
                 "https://fumes.top/fumetune",
             ]
@@ -136,9 +415,97 @@ class FumeTune(commands.AutoShardedBot):
             activity=discord.Game(next(self._status_items)),
         )
 
-    async def _refresh_blacklists(self) -> None:
-        self.blacklisted_users = await get_blacklisted_users(self.pool)
-        self.blacklisted_guilds = await get_blacklisted_guilds(self.pool)
+    @_change_status.before_loop
+    async def _before_change_status(self):
+        # get_counts() suspends in cluster mode, so _update_status_items may not
+        # have set the first items yet.
+        if not isinstance(self._status_items, cycle):
+            await self._update_status_items()
+
+    @tasks.loop(minutes=1)
+    async def _publish_cluster_stats(self) -> None:
+        try:
+            await self.cluster_stats.publish(self.cluster_id, self._local_counts())
+
+        except Exception as e:
+            self.log.error("Failed to publish cluster stats.", exc_info=e)
+
+    def _local_counts(self) -> dict[str, int]:
+        return {
+            "guilds": len(self.guilds),
+            "users": len(self.users),
+            "shards": len(self.shards),
+        }
+
+    async def get_counts(self) -> dict[str, int]:
+        """Guild, user and shard counts across every cluster."""
+        counts = self._local_counts()
+
+        if self.cluster_stats is None:
+            return counts
+
+        try:
+            await self.cluster_stats.publish(self.cluster_id, counts)
+            return await self.cluster_stats.totals()
+
+        except Exception as e:
+            self.log.error("Failed to read cluster stats.", exc_info=e)
+            return counts
+
+    def _collect_metrics(self) -> None:
+        NODE_UP.clear()
+        PLAYERS.clear()
+
+        queue_lengths = list()
+
+        for node in wavelink.Pool.nodes.values():
+            NODE_UP.set(
+                int(node.status is wavelink.NodeStatus.CONNECTED),
+                node=node.identifier,
+            )
+            PLAYERS.set(len(node.players), node=node.identifier)
+
+            queue_lengths.extend(
+                len(player.queue) for player in node.players.values()
+            )
+
+        for bound in _QUEUE_LENGTH_BUCKETS:
+            QUEUE_LENGTHS.set(
+                sum(1 for length in queue_lengths if length <= bound), le=str(bound)
+            )
+
+        QUEUE_LENGTHS.set(len(queue_lengths), le="+Inf")
+
+        DB_POOL.set(self.pool.size, state="size")
+        DB_POOL.set(self.pool.freesize, state="free")
+
+        WEBHOOK_FAILURES.set(self.error_sink.webhook_failures)
+
+    def dispatch(self, event_name: str, /, *args: Any, **kwargs: Any) -> None:
+        if event_name.startswith("wavelink_"):
+            WAVELINK_EVENTS.inc(event=event_name)
+
+        super().dispatch(event_name, *args, **kwargs)
+
+    async def _refresh_blacklists(self, *, full: bool = False) -> None:
+        for name, blacklist in (
+            ("user", self._user_blacklist),
+            ("guild", self._guild_blacklist),
+        ):
+            if await blacklist.sync(self.pool, full=full) and not full:
+                self.log.info(f"The {name} blacklist drifted; ran a full resync.")
+
+    async def _warm_premium_cache(self) -> None:
+        try:
+            premium_users = await get_premium_users(self.pool)
+
+        except Exception as e:
+            return self.log.error("Failed to warm the premium cache.", exc_info=e)
+
+        for user_id in premium_users:
+            self.premium_cache.set(user_id, True)
+
+        self.log.info(f"Warmed the premium cache with {len(premium_users)} user(s).")
 
     @tasks.loop(minutes=5)
     async def _refresh_blacklists_loop(self) -> None:
@@ -148,7 +515,155 @@ class FumeTune(commands.AutoShardedBot):
         except Exception as e:
             self.log.error("Failed to refresh blacklists.", exc_info=e)
 
-    async def connect_nodes(self):
+    @tasks.loop(minutes=10)
+    async def _save_search_cache_loop(self) -> None:
+        try:
+            await self.search_cache.save()
+
+        except Exception as e:
+            self.log.error("Failed to save the search cache.", exc_info=e)
+
+    @tasks.loop(minutes=1)
+    async def _check_database_loop(self) -> None:
+        try:
+            DB_PING.set(await asyncio.wait_for(check_health(self.pool), 10))
+            DB_UP.set(1)
+
+        except Exception as e:
+            DB_UP.set(0)
+            self.log.error("MySQL health check failed.", exc_info=e)
+
+    @tasks.loop(seconds=30)
+    async def _refresh_node_stats_loop(self) -> None:
+        try:
+            await self.node_scheduler.refresh()
+
+        except Exception as e:
+            self.log.error("Failed to refresh music node stats.", exc_info=e)
+
+    @tasks.loop(seconds=30)
+    async def _snapshot_players_loop(self) -> None:
+        try:
+            await self._snapshot_players()
+
+        except Exception as e:
+            self.log.error("Failed to snapshot players.", exc_info=e)
+
+    async def _snapshot_players(self, *, force: bool = False) -> None:
+        players = [vc for vc in self.voice_clients if isinstance(vc, Player)]
+        start = time.perf_counter()
+
+        written = await self.snapshots.snapshot(
+            players, keep=self._pending_restore, force=force
+        )
+        elapsed = time.perf_counter() - start
+
+        self.log.debug(
+            f"Snapshotted {len(players)} player(s), {written} changed, in "
+            f"{elapsed * 1000:.1f}ms "
+            f"({elapsed * 1000 / max(len(players), 1) * 1000:.1f}ms per 1000 guilds)."
+        )
+
+    async def restore_players(self, concurrency: int = 20, max_age: float = 900.0):
+        """Reconnect the players saved in the last snapshot, once per process."""
+        if self._restore_started:
+            return
+
+        self._restore_started = True
+
+        records = {
+            guild_id: self.snapshots.records[guild_id]
+            for guild_id in self._pending_restore
+        }
+
+        # Listeners will have moved on from a session this old.
+        if not records or time.time() - self.snapshots.heartbeat > max_age:
+            self._pending_restore.clear()
+            return
+
+        semaphore = asyncio.Semaphore(concurrency)
+        start = time.perf_counter()
+
+        async def _restore(guild_id: int, state: dict[str, Any]) -> bool:
+            async with semaphore:
+                try:
+                    return await self._restore_player(guild_id, state)
+
+                except Exception as e:
+                    self.log.error(
+                        f"Failed to restore the player in guild {guild_id}.",
+                        exc_info=e,
+                    )
+                    return False
+
+                finally:
+                    self._pending_restore.discard(guild_id)
+
+        results = await asyncio.gather(
+            *(_restore(guild_id, state) for guild_id, state in records.items())
+        )
+        elapsed = time.perf_counter() - start
+
+        self.log.info(
+            f"Restored {results.count(True)} of {len(records)} player(s) in "
+            f"{elapsed:.2f}s ({elapsed / len(records) * 1000:.2f}s per 1000 guilds)."
+        )
+
+    async def _restore_player(self, guild_id: int, state: dict[str, Any]) -> bool:
+        guild = self.get_guild(guild_id)
+
+        if not guild or guild.voice_client:
+            return False
+
+        channel = guild.get_channel(state["channel"])
+        text_channel = guild.get_channel(state["text"])
+
+        if not isinstance(channel, (discord.VoiceChannel, discord.StageChannel)):
+            return False
+
+        if not text_channel or all(member.bot for member in channel.members):
+            return False
+
+        node = self.node_scheduler.choose(guild_id)
+        player = Player(
+            ctx=RestoredContext(
+                guild=guild,
+                channel=text_channel,
+                user=self.get_cached_member(guild, state["dj"]) or guild.me,
+            ),
+            nodes=[node] if node else None,
+        )
+
+        await channel.connect(cls=player, timeout=10.0)
+
+        player.loop = state["loop"]
+        player.loop_queue = state["loop_queue"]
+
+        if state["queue"]:
+            player.queue.put([load_track(entry) for entry in state["queue"]])
+
+        filters = wavelink.Filters(data=state["filters"])
+
+        if state["current"]:
+            await player.play(
+                load_track(state["current"]),
+                start=resume_position(state, self.snapshots.heartbeat),
+                volume=state["volume"],
+                paused=state["paused"],
+                filters=filters,
+            )
+
+        else:
+            await player.set_filters(filters)
+            await player.set_volume(state["volume"])
+
+            # Idle players go back to waiting on the queue, with the usual timeout.
+            asyncio.create_task(player.do_next())
+
+        return True
+
+    async def connect_nodes(self) -> None:
+        """Connect every music node at once, giving each ``NODE_CONNECT_TIMEOUT``."""
         nodes = list()
 
         for node in self.config.MUSIC_NODES:
@@ -160,7 +675,31 @@ class FumeTune(commands.AutoShardedBot):
                 )
             )
 
-        await wavelink.Pool.connect(nodes=nodes, client=self, cache_capacity=100)
+        # Search results are cached by the bot (see SearchCache), so wavelink's own
+        # LFU request cache is left disabled.
+        self._node_tasks = {
+            node.identifier: asyncio.create_task(
+                wavelink.Pool.connect(nodes=[node], client=self)
+            )
+            for node in nodes
+        }
+
+        if not self._node_tasks:
+            return
+
+        timeout = self.config.NODE_CONNECT_TIMEOUT
+        _, pending = await asyncio.wait(self._node_tasks.values(), timeout=timeout)
+
+        for identifier, task in self._node_tasks.items():
+            # Wavelink keeps retrying it; it joins the pool once it comes online.
+            if task in pending:
+                self.log.warning(
+                    f"Music node {identifier} did not connect within {timeout:g}s; "
+                    f"still trying in the background."
+                )
+
+            elif identifier not in wavelink.Pool.nodes:
+                self.log.error(f"Music node {identifier} failed to connect.")
 
     async def on_ready(self) -> None:
         self._launch_time = datetime.now()
@@ -169,13 +708,38 @@ class FumeTune(commands.AutoShardedBot):
             self._update_status_items.start()
             self._change_status.start()
             self._refresh_blacklists_loop.start()
+            self._save_search_cache_loop.start()
+            self._refresh_node_stats_loop.start()
+            self._snapshot_players_loop.start()
+            self._check_database_loop.start()
+
+            if self.cluster_stats is not None:
+                self._publish_cluster_stats.start()
 
         except RuntimeError:
             self._update_status_items.restart()
             self._change_status.restart()
             self._refresh_blacklists_loop.restart()
+            self._save_search_cache_loop.restart()
+            self._refresh_node_stats_loop.restart()
+            self._snapshot_players_loop.restart()
+            self._check_database_loop.restart()
+
+            if self.cluster_stats is not None:
+                self._publish_cluster_stats.restart()
+
+        # on_ready fires again after every gateway reconnect; nodes connect once.
+        if self._node_bootstrap is None:
+            self._node_bootstrap = asyncio.create_task(self.connect_nodes())
+
+        if not self._guilds_reconciled:
+            self._guilds_reconciled = True
 
-        await self.connect_nodes()
+            try:
+                await self._reconcile_guilds()
+
+            except Exception as e:
+                self.log.error("Failed to reconcile guilds.", exc_info=e)
 
         self.log.info("FumeTune is ready.")
 
@@ -218,32 +782,70 @@ class FumeTune(commands.AutoShardedBot):
             await message.reply(content="Hello there! Use `/help` to get started.")
 
     async def on_guild_join(self, guild) -> None:
-        if await is_blacklisted_guild(self.pool, guild.id):
-            try:
-                await guild.system_channel.send(
-                    "This server has been blacklisted from using the FumeStop service. "
-                    "To appeal, join our community server.",
-                    view=discord.ui.View().add_item(
-                        discord.ui.Button(
-                            label="Community Server Invite",
-                            url="https://fumes.top/community",
-                        )
-                    ),
-                )
+        if guild.id in self.blacklisted_guilds:
+            return await self._leave_blacklisted_guild(guild)
 
-            except (discord.Forbidden, discord.errors.Forbidden):
-                pass
+        await add_guild(self.pool, guild_id=guild.id)
 
-            return await guild.leave()
+    async def _leave_blacklisted_guild(self, guild: discord.Guild) -> None:
+        try:
+            await guild.system_channel.send(
+                "This server has been blacklisted from using the FumeStop service. "
+                "To appeal, join our community server.",
+                view=discord.ui.View().add_item(
+                    discord.ui.Button(
+                        label="Community Server Invite",
+                        url="https://fumes.top/community",
+                    )
+                ),
+            )
+
+        except (discord.Forbidden, discord.errors.Forbidden, AttributeError):
+            # AttributeError: the guild has no system channel.
+            pass
+
+        await guild.leave()
+
+    async def _reconcile_guilds(self) -> None:
+        """Register guilds joined (and leave blacklisted ones) while we were down."""
+        for guild in [g for g in self.guilds if g.id in self.blacklisted_guilds]:
+            await self._leave_blacklisted_guild(guild)
+
+        known = await get_guild_ids(self.pool)
+        missing = (
+            {guild.id for guild in self.guilds} - known - self.blacklisted_guilds
+        )
 
-        if not await guild_exists(self.pool, guild_id=guild.id):
-            return await add_guild(self.pool, guild_id=guild.id)
+        if missing:
+            added = await add_guilds(self.pool, missing)
+            self.log.info(f"Registered {added} guild(s) joined while offline.")
 
     async def start(self, **kwargs) -> None:
         await super().start(Config.TOKEN, reconnect=True)
 
     async def close(self) -> None:
+        # Before super().close(), which disconnects every player.
+        try:
+            await self._snapshot_players(force=True)
+
+        except Exception as e:
+            self.log.error("Failed to snapshot players.", exc_info=e)
+
+        for task in self._node_tasks.values():
+            task.cancel()
+
         await super().close()
+        await self.error_sink.close()
+
+        if self.metrics:
+            await self.metrics.close()
+
+        try:
+            await self.search_cache.save()
+
+        except Exception as e:
+            self.log.error("Failed to save the search cache.", exc_info=e)
+
         await self.session.close()
 
         self.pool.close()
@@ -252,6 +854,19 @@ class FumeTune(commands.AutoShardedBot):
         self._update_status_items.stop()
         self._change_status.stop()
         self._refresh_blacklists_loop.stop()
+        self._save_search_cache_loop.stop()
+        self._refresh_node_stats_loop.stop()
+        self._snapshot_players_loop.stop()
+        self._check_database_loop.stop()
+        self._publish_cluster_stats.stop()
+
+    def get_cached_member(
+        self, guild: discord.Guild, user_id: int
+    ) -> Optional[discord.Member]:
+        """A cached member or, in low memory mode, one from a recent interaction."""
+        return guild.get_member(user_id) or self.recent_members.get(
+            (guild.id, user_id)
+        )
 
     @property
     def config(self):
@@ -265,6 +880,10 @@ class FumeTune(commands.AutoShardedBot):
     def launch_time(self) -> datetime:
         return self._launch_time
 
+    @property
+    def cluster_id(self) -> int:
+        return self.cluster.id if self.cluster else 0
+
     @property
     def owner(self) -> discord.User:
         return self.bot_app_info.owner
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
+
+import wavelink
 
 import discord
 from discord import app_commands
@@ -120,12 +122,141 @@ class Dev(commands.Cog):
                 content="Sorry, this is an owner only command!"
             )
 
-        await self.bot.tree.sync()
+        self.bot.app_command_count = len(await self.bot.tree.sync())
         await self.bot.tree.sync(guild=ctx.guild)
         self.bot.tree.copy_global_to(guild=ctx.guild)
 
         await ctx.edit_original_response(content="Synced.")
 
+    @app_commands.command(name="drain")
+    @app_commands.guilds(Config.COMMUNITY_GUILD_ID)
+    async def _drain(
+        self,
+        ctx: discord.Interaction,
+        node: str,
+        wave_size: Optional[int] = 10,
+        interval: Optional[float] = 5.0,
+    ):
+        """Move every player off a music node, e.g. before a Lavalink upgrade.
+
+        Parameters
+        ----------
+        node : str
+            The identifier of the node to drain.
+        wave_size : Optional[int]
+            How many players to move at once.
+        interval : Optional[float]
+            Seconds to wait between waves.
+
+        """
+        # noinspection PyUnresolvedReferences
+        await ctx.response.defer(thinking=True)
+
+        if self.bot.owner != ctx.user:
+            return await ctx.edit_original_response(
+                content="Sorry, this is an owner only command!"
+            )
+
+        try:
+            _node = wavelink.Pool.get_node(node)
+
+        except wavelink.InvalidNodeException:
+            return await ctx.edit_original_response(
+                content="Sorry, no such music node found."
+            )
+
+        async def progress(moved: int, failed: int, total: int):
+            try:
+                await ctx.edit_original_response(
+                    content=f"Draining `{node}` ... **{moved}** moved, "
+                    f"**{failed}** failed, **{total - moved - failed}** remaining."
+                )
+
+            except discord.HTTPException:
+                # The interaction token expires after 15 minutes; keep draining.
+                pass
+
+        moved, failed = await self.bot.node_scheduler.drain(
+            _node, wave_size=max(1, wave_size), interval=interval, progress=progress
+        )
+
+        await ctx.edit_original_response(
+            content=f"Drained `{node}`: **{moved}** moved, **{failed}** failed. "
+            f"It will receive no new players until `/undrain` is used."
+        )
+
+    @app_commands.command(name="undrain")
+    @app_commands.guilds(Config.COMMUNITY_GUILD_ID)
+    async def _undrain(self, ctx: discord.Interaction, node: str):
+        """Allow a drained music node to receive players again.
+
+        Parameters
+        ----------
+        node : str
+            The identifier of the node.
+
+        """
+        # noinspection PyUnresolvedReferences
+        await ctx.response.defer(thinking=True)
+
+        if self.bot.owner != ctx.user:
+            return await ctx.edit_original_response(
+                content="Sorry, this is an owner only command!"
+            )
+
+        self.bot.node_scheduler.draining.discard(node)
+
+        await ctx.edit_original_response(
+            content=f"`{node}` can receive players again."
+        )
+
+    @app_commands.command(name="stalls")
+    @app_commands.guilds(Config.COMMUNITY_GUILD_ID)
+    async def _stalls(
+        self, ctx: discord.Interaction, count: app_commands.Range[int, 1, 25] = 5
+    ):
+        """Show the most recent event loop stalls.
+
+        Parameters
+        ----------
+        count : app_commands.Range[int, 1, 25]
+            How many stalls to show, up to 25 (an embed's field limit).
+
+        """
+        # noinspection PyUnresolvedReferences
+        await ctx.response.defer(thinking=True)
+
+        if self.bot.owner != ctx.user:
+            return await ctx.edit_original_response(
+                content="Sorry, this is an owner only command!"
+            )
+
+        watchdog = self.bot.watchdog
+        stalls = list(watchdog.stalls)[-count:]
+
+        if not stalls:
+            return await ctx.edit_original_response(
+                content="No event loop stalls have been recorded."
+            )
+
+        embed = discord.Embed(
+            color=self.bot.embed_color,
+            title="Event Loop Stalls",
+            description=f"Worst lag since start: `{watchdog.max_lag:.3f}s` "
+            f"(threshold `{watchdog.threshold}s`)",
+        )
+
+        for stall in reversed(stalls):
+            embed.add_field(
+                name=f"{stall.at.strftime('%Y-%m-%d %H:%M:%S')} | "
+                f"{stall.duration:.3f}s",
+                value=f"Location: `{stall.location or 'unknown'}`\n"
+                f"Cog: `{stall.cog or '-'}` | Command: `{stall.command or '-'}`",
+                inline=False,
+            )
+
+        await ctx.edit_original_response(embed=embed)
+
 
 async def setup(bot: FumeTune):
     await bot.add_cog(Dev(bot))
@@ -2,14 +2,14 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-import random
-import string
 import traceback
 
 import discord
 from discord import app_commands
 from discord.ext import commands
 
+from utils.logsink import fingerprint
+
 if TYPE_CHECKING:
     from bot import FumeTune
 
@@ -62,32 +62,25 @@ class Error(commands.Cog):
                     # noinspection PyUnresolvedReferences
                     await ctx.response.send_message(embed=embed, ephemeral=True)
 
-                embed.title = "Error Report"
-                embed.description = ""
-
-                embed.add_field(
-                    name="Command", value=f"`{ctx.command.name}`", inline=False
-                )
-                embed.add_field(
-                    name="Server",
-                    value=f"**{ctx.guild.name}** `({ctx.guild.id})`",
-                    inline=False,
-                )
-
-                file_name = (
-                    f"logs/errors/{ctx.guild.id}-{ctx.command.name}-"
-                    f"{''.join(random.choices(string.ascii_letters + string.digits, k=10))}.log"
+                original = getattr(error, "original", error)
+                frames = traceback.extract_tb(original.__traceback__)
+                origin = (
+                    f"{frames[-1].filename}:{frames[-1].lineno}" if frames else ""
                 )
 
-                with open(file_name, "w") as f:
-                    f.write("".join(traceback.format_exception(error)))
-
-                embed.add_field(
-                    name="Log",
-                    value=f"Saved to `{file_name}`",
+                self.bot.error_sink.report(
+                    "errors",
+                    fingerprint(ctx.command.name, type(original).__name__, origin),
+                    title="Error Report",
+                    fields={
+                        "Command": f"`{ctx.command.name}`",
+                        "Server": f"**{ctx.guild.name}** `({ctx.guild.id})`",
+                    },
+                    detail=f"command={ctx.command.name} guild={ctx.guild.id}\n"
+                    + "".join(traceback.format_exception(error)),
                 )
 
-                return await self.bot.webhook.send(embed=embed)
+                return
 
             # noinspection PyUnresolvedReferences
             if ctx.response.is_done():
@@ -1,12 +1,17 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Optional
+
+import asyncio
 
 import discord
 from discord.ext import commands
-from discord.ext.ipc import Server
+from discord.ext.ipc import Client, Server
 from discord.ext.ipc.objects import ClientPayload
 
+from utils.cache import TTLCache
+from utils.cluster import cluster_for_guild
+
 if TYPE_CHECKING:
     from bot import FumeTune
 
@@ -15,30 +20,155 @@ class IPC(commands.Cog):
     def __init__(self, bot: FumeTune):
         self.bot: FumeTune = bot
 
+        # The dashboard polls the counts constantly; they are fine a little stale.
+        self._cache: TTLCache = TTLCache(maxsize=16, ttl=30)
+
+        # Mutual guilds per user, so dashboard page loads don't repeat lookups.
+        self._mutual_guilds: TTLCache = TTLCache(maxsize=1024, ttl=30)
+        self.mutual_guilds_budget: float = 2.5
+
+        # Gateway member requests are limited per shard, REST calls globally.
+        self._shard_limits: dict[int, asyncio.Semaphore] = dict()
+        self._rest_limit: asyncio.Semaphore = asyncio.Semaphore(8)
+        self._lookups: dict[tuple[int, int], asyncio.Task] = dict()
+
+        # One multicast client per other cluster, on that cluster's own port.
+        self._peers: dict[int, Client] = dict()
+        cluster = self.bot.cluster
+
+        if cluster and cluster.count > 1:
+            for cluster_id in range(cluster.count):
+                if cluster_id == cluster.id:
+                    continue
+
+                self._peers[cluster_id] = Client(
+                    secret_key=self.bot.config.IPC_SECRET_KEY,
+                    multicast_port=self.bot.config.IPC_MULTICAST_PORT + cluster_id,
+                    timeout=5,
+                )
+
+    @staticmethod
+    def _is_local(data: ClientPayload) -> bool:
+        # Set on requests forwarded by another cluster, so they are answered
+        # from this process only instead of being forwarded again.
+        return bool((data.data or {}).get("local"))
+
+    async def _ask(
+        self, cluster_id: int, endpoint: str, **kwargs: Any
+    ) -> Optional[dict]:
+        try:
+            response = await self._peers[cluster_id].request(
+                endpoint, local=True, **kwargs
+            )
+
+        except Exception as e:
+            self.bot.log.error(
+                f"IPC request {endpoint!r} to cluster {cluster_id} failed.",
+                exc_info=e,
+            )
+            return None
+
+        if response.error or not isinstance(response.response, dict):
+            return None
+
+        return response.response
+
+    async def _fan_out(self, endpoint: str, **kwargs: Any) -> list[dict]:
+        results = await asyncio.gather(
+            *(
+                self._ask(cluster_id, endpoint, **kwargs)
+                for cluster_id in self._peers
+            )
+        )
+
+        return [result for result in results if result is not None]
+
+    async def _cached_counts(self) -> dict[str, int]:
+        if counts := self._cache.get("counts"):
+            return counts
+
+        counts = await self.bot.get_counts()
+        self._cache.set("counts", counts)
+
+        return counts
+
     async def cog_load(self):
         await self.bot.ipc.start()
 
     async def cog_unload(self):
         await self.bot.ipc.stop()
 
+        for task in self._lookups.values():
+            task.cancel()
+
     # noinspection PyUnusedLocal
     @Server.route(name="get_guild_count")
     async def _get_guild_count(self, data: ClientPayload):
-        return {"status": 200, "count": len(self.bot.guilds)}
+        counts = await self._cached_counts()
+        return {"status": 200, "count": counts["guilds"]}
 
     # noinspection PyUnusedLocal
     @Server.route(name="get_user_count")
     async def _get_user_count(self, data: ClientPayload):
-        return {"status": 200, "count": len(self.bot.users)}
+        counts = await self._cached_counts()
+        return {"status": 200, "count": counts["users"]}
 
     # noinspection PyUnusedLocal
     @Server.route(name="get_command_count")
     async def _get_command_count(self, data: ClientPayload):
-        _commands = await self.bot.tree.fetch_commands()
-        return {"status": 200, "count": len(_commands)}
+        # Kept up to date by /sync; only fetched here after a restart.
+        if self.bot.app_command_count is None:
+            _commands = await self.bot.tree.fetch_commands()
+            self.bot.app_command_count = len(_commands)
+
+        return {"status": 200, "count": self.bot.app_command_count}
+
+    @Server.route(name="invalidate_premium")
+    async def _invalidate_premium(self, data: ClientPayload):
+        # Called by the dashboard whenever a user's premium status changes, so
+        # the cooldown resolvers stop serving the stale cached value.
+        user_id = (data.data or {}).get("user_id")
+
+        if user_id is None:
+            self.bot.premium_cache.clear()
+
+        else:
+            self.bot.premium_cache.invalidate(int(user_id))
+
+        return {"status": 200}
+
+    # noinspection PyUnusedLocal
+    @Server.route(name="get_premium_cache_stats")
+    async def _get_premium_cache_stats(self, data: ClientPayload):
+        cache = self.bot.premium_cache
+
+        return {
+            "status": 200,
+            "size": len(cache),
+            "hits": cache.hits,
+            "misses": cache.misses,
+            "hit_rate": round(cache.hit_rate, 4),
+        }
+
+    # noinspection PyUnusedLocal
+    @Server.route(name="get_search_cache_stats")
+    async def _get_search_cache_stats(self, data: ClientPayload):
+        return {"status": 200, **self.bot.search_cache.stats()}
 
     @Server.route(name="get_channel_list")
     async def _get_channel_list(self, data: ClientPayload):
+        cluster = self.bot.cluster
+
+        if self._peers and not self._is_local(data):
+            owner = cluster_for_guild(
+                data.guild_id, cluster.shard_count, cluster.count
+            )
+
+            if owner != cluster.id:
+                return await self._ask(
+                    owner, "get_channel_list", guild_id=data.guild_id
+                ) or {"error": {"code": 503, "message": "Cluster unavailable."}}
+
         guild = self.bot.get_guild(data.guild_id)
 
         if not guild:
@@ -57,30 +187,112 @@ class IPC(commands.Cog):
 
     @Server.route(name="get_mutual_guilds")
     async def _get_mutual_guilds(self, data: ClientPayload):
-        user = self.bot.get_user(data.user_id)
+        if self._peers and not self._is_local(data):
+            local, remote = await asyncio.gather(
+                self._local_mutual_guilds(data.user_id),
+                self._fan_out("get_mutual_guilds", user_id=data.user_id),
+            )
+            guilds = dict(local or {})
 
-        if not user:
+            for result in remote:
+                guilds.update(result.get("guilds", {}))
+
+            if local is None and not guilds:
+                return {"error": {"code": 404, "message": "User not found."}}
+
+            return {"guilds": guilds}
+
+        guilds = await self._local_mutual_guilds(data.user_id)
+
+        if guilds is None:
             return {"error": {"code": 404, "message": "User not found."}}
 
+        return {"guilds": guilds}
+
+    async def _resolve_member(
+        self, guild: discord.Guild, user_id: int
+    ) -> Optional[discord.Member]:
+        limit = self._shard_limits.setdefault(guild.shard_id, asyncio.Semaphore(4))
+
+        async with limit:
+            try:
+                # Cached on success, so the next lookup is free.
+                members = await asyncio.wait_for(
+                    guild.query_members(user_ids=[user_id], limit=1), timeout=5.0
+                )
+                return members[0] if members else None
+
+            except (asyncio.TimeoutError, discord.ClientException):
+                pass
+
+        async with self._rest_limit:
+            try:
+                return await guild.fetch_member(user_id)
+
+            except discord.HTTPException:
+                return None
+
+    async def _local_mutual_guilds(self, user_id: int) -> Optional[dict]:
+        """This cluster's guilds shared with the user, or ``None`` if unknown."""
+        if (cached := self._mutual_guilds.get(user_id)) is not None:
+            return cached
+
+        user = self.bot.get_user(user_id)
+
+        if not user:
+            return None
+
         guilds = dict()
+        tasks: dict[asyncio.Task, discord.Guild] = dict()
 
         for guild in user.mutual_guilds:
-            member = guild.get_member(user.id)
+            if member := self.bot.get_cached_member(guild, user.id):
+                guilds[guild.id] = self._mutual_guild_entry(guild, member)
+
+            else:
+                # Shared with earlier requests whose lookups are still running.
+                key = (guild.id, user.id)
+
+                if not (task := self._lookups.get(key)):
+                    task = asyncio.create_task(self._resolve_member(guild, user.id))
+                    task.add_done_callback(
+                        lambda _, k=key: self._lookups.pop(k, None)
+                    )
+                    self._lookups[key] = task
+
+                tasks[task] = guild
+
+        pending = set()
+        failed = False
 
-            if member is None:
-                try:
-                    member = await guild.fetch_member(user.id)
+        if tasks:
+            done, pending = await asyncio.wait(
+                tasks, timeout=self.mutual_guilds_budget
+            )
 
-                except discord.HTTPException:
+            for task in done:
+                if task.cancelled() or task.exception():
+                    failed = True
                     continue
 
-            guilds[guild.id] = {
-                "name": guild.name,
-                "member_manage_guild": member.guild_permissions.manage_guild,
-                "bot_manage_nicknames": guild.me.guild_permissions.manage_nicknames,
-            }
+                if member := task.result():
+                    guild = tasks[task]
+                    guilds[guild.id] = self._mutual_guild_entry(guild, member)
 
-        return {"guilds": guilds}
+        # Lookups past the latency budget keep filling the member cache in the
+        # background; a partial or failed result isn't cached.
+        if not pending and not failed:
+            self._mutual_guilds.set(user_id, guilds)
+
+        return guilds
+
+    @staticmethod
+    def _mutual_guild_entry(guild: discord.Guild, member: discord.Member) -> dict:
+        return {
+            "name": guild.name,
+            "member_manage_guild": member.guild_permissions.manage_guild,
+            "bot_manage_nicknames": guild.me.guild_permissions.manage_nicknames,
+        }
 
 
 async def setup(bot: FumeTune):
@@ -15,8 +15,10 @@ class TopGG(commands.Cog):
     @tasks.loop(minutes=15)
     async def _update_stats(self):
         try:
+            counts = await self.bot.get_counts()
+
             await self.bot.topggpy.post_guild_count(
-                guild_count=len(self.bot.guilds), shard_count=len(self.bot.shards)
+                guild_count=counts["guilds"], shard_count=counts["shards"]
             )
             self.bot.log.info(
                 f"Posted server count ({self.bot.topggpy.guild_count})"
@@ -35,6 +37,10 @@ class TopGG(commands.Cog):
             )
             return
 
+        # Only the first cluster posts, with every cluster's totals.
+        if self.bot.cluster_id != 0:
+            return
+
         self._update_stats.start()
         self.bot.log.info("Top.gg webhook is ready")
 
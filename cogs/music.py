@@ -3,8 +3,6 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, Optional, cast
 
 import json
-import random
-import string
 
 import wavelink
 
@@ -14,12 +12,14 @@ from discord.ext import commands
 from discord.ext.menus.views import ViewMenuPages
 
 from utils.cd import cooldown_level_0
-from utils.tools import MAX_TRACK_LENGTH_MS, parse_duration
+from utils.tools import parse_duration
 from utils.views import TrackConfirm, PlaylistConfirm
 from utils.checks import initial_checks
 from utils.player import Player
 from utils.helpers import is_privileged, required_votes
+from utils.logsink import fingerprint
 from utils.selects import TrackSelect
+from utils.prefetch import MIRRORED_SOURCES
 from utils.paginators import QueuePaginatorSource
 
 if TYPE_CHECKING:
@@ -33,6 +33,10 @@ class Music(commands.Cog):
     @commands.Cog.listener()
     async def on_wavelink_node_ready(self, payload: wavelink.NodeReadyEventPayload):
         self.bot.log.info(f"Music node {payload.node.identifier} is ready")
+        self.bot.music_ready.set()
+
+        # Sessions saved before the last restart come back on the first ready node.
+        await self.bot.restore_players()
 
     @commands.Cog.listener()
     async def on_wavelink_node_disconnected(
@@ -50,20 +54,13 @@ class Music(commands.Cog):
         self, node: wavelink.Node, disconnected: list[wavelink.Player]
     ):
         # Best-effort failover: a closed node has already disconnected its players,
-        # so we reconnect each one on the least-loaded healthy node and resume the
-        # current track from where it left off.
+        # so we reconnect each one on the least-loaded healthy node (as scored by
+        # the node scheduler) and resume the current track from where it left off.
         self.bot.log.warning(
             f"Music node {node.identifier} closed with "
             f"{len(disconnected)} active player(s); attempting failover."
         )
 
-        healthy = [
-            n
-            for n in wavelink.Pool.nodes.values()
-            if n.status is wavelink.NodeStatus.CONNECTED
-            and n.identifier != node.identifier
-        ]
-
         for player in disconnected:
             player = cast(Player, player)
 
@@ -73,26 +70,29 @@ class Music(commands.Cog):
             position = player.position
             guild_id = getattr(player.guild, "id", "?")
 
-            if not healthy or channel is None or ctx is None:
+            target = self.bot.node_scheduler.choose(
+                getattr(player.guild, "id", 0), exclude=(node.identifier,)
+            )
+
+            if target is None or channel is None or ctx is None:
                 self.bot.log.error(
                     f"Failover unavailable for guild {guild_id} "
                     f"(no healthy node or missing player state)."
                 )
-                await self._safe_send(
-                    ctx,
+                self._safe_send(
+                    player,
                     "A music node went down and no backup was available. "
                     "Playback has stopped — please start again.",
                 )
                 continue
 
-            target = sorted(healthy, key=lambda n: len(n.players))[0]
-
             try:
-                new_player = Player(ctx=ctx)
+                new_player = Player(ctx=ctx, nodes=[target])
                 new_player.queue = player.queue
                 new_player.loop = player.loop
                 new_player.loop_queue = player.loop_queue
                 new_player.dj = player.dj
+                new_player.messages = player.messages
 
                 await channel.connect(cls=new_player, timeout=10.0)
                 await new_player.set_volume(player.volume)
@@ -105,30 +105,26 @@ class Music(commands.Cog):
                 self.bot.log.info(
                     f"Failed over guild {guild_id} to node {target.identifier}."
                 )
-                await self._safe_send(
-                    ctx,
+                self._safe_send(
+                    new_player,
                     "⚠️ A music node went down — reconnected on a "
                     "backup node and resumed playback.",
                 )
 
             except Exception as exc:
                 self.bot.log.error(f"Failover failed for guild {guild_id}: {exc!r}")
-                await self._safe_send(
-                    ctx,
+                self._safe_send(
+                    player,
                     "A music node went down and reconnecting to a backup failed. "
                     "Playback has stopped — please start again.",
                 )
 
     @staticmethod
-    async def _safe_send(ctx: discord.Interaction | None, message: str):
-        if ctx is None:
+    def _safe_send(player: Player, message: str):
+        if getattr(player, "ctx", None) is None:
             return
 
-        try:
-            await ctx.channel.send(content=message)
-
-        except (discord.Forbidden, discord.HTTPException):
-            pass
+        player.messages.post("failover", content=message)
 
     @commands.Cog.listener()
     async def on_wavelink_track_exception(
@@ -144,35 +140,35 @@ class Music(commands.Cog):
 
         await player.do_next()
 
-        await player.ctx.channel.send(
+        player.messages.post(
+            "notice",
             content="The song encountered an error, **it is being skipped** "
-            "(Any loops if set have been removed)."
+            "(Any loops if set have been removed).",
         )
 
-        embed = discord.Embed(colour=self.bot.embed_color)
-        embed.add_field(name="Track", value=f"`{payload.track.title}`", inline=False)
-
         # noinspection PyUnresolvedReferences
         exception = {
             "title": payload.track.title,
+            "identifier": payload.track.identifier,
             "source": payload.track.source,
             "severity": payload.exception["severity"],
             "cause": payload.exception["cause"],
             "message": payload.exception["message"],
         }
 
-        file_name = (
-            f"logs/tracks/{payload.track.identifier}-"
-            f"{''.join(random.choices(string.ascii_letters + string.digits, k=10))}.log"
+        self.bot.error_sink.report(
+            "tracks",
+            fingerprint(
+                exception["source"], exception["cause"], exception["message"]
+            ),
+            title="Track Exception",
+            fields={
+                "Track": f"`{payload.track.title}`",
+                "Cause": f"`{exception['cause']}`",
+            },
+            detail=json.dumps(exception, indent=4),
         )
 
-        with open(file_name, "w") as f:
-            json.dump(exception, f, indent=4)
-
-        embed.add_field(name="Log", value=f"Saved to `{file_name}`", inline=False)
-
-        await self.bot.webhook.send(embed=embed)
-
     @commands.Cog.listener()
     async def on_wavelink_track_stuck(
         self, payload: wavelink.TrackStuckEventPayload
@@ -185,10 +181,21 @@ class Music(commands.Cog):
         player.queue.put_at(0, payload.track)
         await player.do_next()
 
-        await player.ctx.channel.send(
-            content="The song got stuck, **it is being replayed.**"
+        player.messages.post(
+            "notice", content="The song got stuck, **it is being replayed.**"
         )
 
+    @commands.Cog.listener()
+    async def on_wavelink_track_start(
+        self, payload: wavelink.TrackStartEventPayload
+    ):
+        player: Player = cast(Player, payload.player)
+
+        if not player:
+            return
+
+        player.prefetcher.track_started()
+
     @commands.Cog.listener()
     async def on_wavelink_track_end(self, payload: wavelink.TrackEndEventPayload):
         player: Player = cast(Player, payload.player)
@@ -196,6 +203,9 @@ class Music(commands.Cog):
         if not player:
             return
 
+        if payload.reason == "finished":
+            player.prefetcher.track_finished()
+
         if player.loop:
             player.queue.put_at(0, payload.original)
 
@@ -203,9 +213,10 @@ class Music(commands.Cog):
             await player.queue.put_wait(payload.original)
 
         if player.queue.count == 0:
-            await player.ctx.channel.send(
+            player.messages.post(
+                "queue_end",
                 content="End of queue reached, add more songs to continue playing. "
-                "The player will automatically disconnect in **5 minutes** if no songs are added."
+                "The player will automatically disconnect in **5 minutes** if no songs are added.",
             )
 
         await player.do_next()
@@ -279,8 +290,12 @@ class Music(commands.Cog):
             )
             return False
 
+        node = self.bot.node_scheduler.choose(ctx.guild.id)
+
         try:
-            await channel.connect(cls=Player(ctx=ctx), timeout=10.0)
+            await channel.connect(
+                cls=Player(ctx=ctx, nodes=[node] if node else None), timeout=10.0
+            )
 
         except wavelink.exceptions.ChannelTimeoutException:
             await ctx.edit_original_response(
@@ -312,7 +327,7 @@ class Music(commands.Cog):
         player: Player = cast(Player, ctx.guild.voice_client)
 
         try:
-            tracks: wavelink.Search = await wavelink.Playable.search(query)
+            tracks: wavelink.Search = await self.bot.search_cache.search(query)
 
         except (
             wavelink.exceptions.LavalinkException,
@@ -329,32 +344,65 @@ class Music(commands.Cog):
                 content=f"No matches found for `{query}`!"
             )
 
+        elif (
+            isinstance(tracks, wavelink.Playlist)
+            and tracks.tracks
+            and all(track.source in MIRRORED_SOURCES for track in tracks.tracks)
+        ):
+            return await self._enqueue_mirrored_playlist(ctx, player, tracks)
+
         elif isinstance(tracks, wavelink.Playlist):
-            if any(track.length > MAX_TRACK_LENGTH_MS for track in tracks.tracks):
+            if not player.enqueue(tracks.tracks, requester_id=ctx.user.id):
                 return await ctx.edit_original_response(
                     content="Sorry, one or more songs are too long to be played **(>24 hours)**."
                 )
 
-            for track in tracks.tracks:
-                track.extras = {"requester_id": ctx.user.id}
-                await player.queue.put_wait(track)
-
         else:
-            track: wavelink.Playable = tracks[0]
-
-            if track.length > MAX_TRACK_LENGTH_MS:
+            if not player.enqueue(tracks[:1], requester_id=ctx.user.id):
                 return await ctx.edit_original_response(
                     content="Sorry, the song is too long to be played **(>24 hours)**."
                 )
 
-            track.extras = {"requester_id": ctx.user.id}
-            await player.queue.put_wait(track)
-
         if not player.playing:
             await player.do_next()
 
         await ctx.edit_original_response(content="Enqueued! \U0001f44c")
 
+    @staticmethod
+    async def _enqueue_mirrored_playlist(
+        ctx: discord.Interaction, player: Player, playlist: wavelink.Playlist
+    ):
+        # Every track has to be matched on YouTube; queue them as they resolve
+        # instead of making the user wait for the whole playlist. Progress is
+        # reported every few seconds and once more when it's done.
+        total = len(playlist.tracks)
+
+        async def progress(queued: int, skipped: int, done: bool):
+            if done:
+                content = f"Enqueued {queued} track(s) from **{playlist.name}**! \U0001f44c"
+
+                if skipped:
+                    content += (
+                        f"\n{skipped} track(s) could not be found and were skipped."
+                    )
+
+            else:
+                content = (
+                    f"Enqueuing **{playlist.name}**: "
+                    f"{queued + skipped}/{total} track(s) processed..."
+                )
+
+            try:
+                await ctx.edit_original_response(content=content)
+
+            except discord.HTTPException:
+                # The interaction token expires after 15 minutes.
+                pass
+
+        await player.enqueue_mirrored(
+            playlist.tracks, requester_id=ctx.user.id, progress=progress
+        )
+
     @app_commands.command(name="search")
     @app_commands.check(initial_checks)
     @app_commands.checks.dynamic_cooldown(cooldown_level_0)
@@ -377,7 +425,7 @@ class Music(commands.Cog):
         embed = discord.Embed(color=self.bot.embed_color)
 
         try:
-            tracks: wavelink.Search = await wavelink.Playable.search(query)
+            tracks: wavelink.Search = await self.bot.search_cache.search(query)
 
         except (
             wavelink.exceptions.LavalinkException,
@@ -511,7 +559,8 @@ class Music(commands.Cog):
         player: Player = cast(Player, ctx.guild.voice_client)
 
         if not player:
-            pl = Player(ctx=ctx)
+            node = self.bot.node_scheduler.choose(ctx.guild.id)
+            pl = Player(ctx=ctx, nodes=[node] if node else None)
 
             try:
                 _: Player = await channel.connect(cls=pl, timeout=10.0)
@@ -781,13 +830,7 @@ class Music(commands.Cog):
                 content="I am not playing any songs in this server right now."
             )
 
-        embed, view = player.build_track_embed()
-
-        embed.set_field_at(
-            0,
-            name="Position",
-            value=f"`{parse_duration(player.position)}/{parse_duration(player.current.length)}`",
-        )
+        embed, view = player.build_track_embed(position=True)
 
         await ctx.edit_original_response(embed=embed, view=view)
 
@@ -812,8 +855,7 @@ class Music(commands.Cog):
                 content="There are no more songs in the queue."
             )
 
-        entries = list(enumerate([track for track in player.queue], 1))
-        pages = QueuePaginatorSource(entries=entries, ctx=ctx)
+        pages = QueuePaginatorSource(ctx=ctx)
         paginator = ViewMenuPages(
             source=pages,
             timeout=None,
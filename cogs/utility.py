@@ -2,9 +2,7 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Optional
 
-import textwrap
-
-from lyricsgenius import Genius
+import asyncio
 
 import discord
 from discord import app_commands
@@ -13,6 +11,7 @@ from discord.ext.menus.views import ViewMenuPages
 
 from utils.cd import cooldown_level_0, cooldown_level_1
 from utils.tools import parse_duration
+from utils.lyrics import LyricsService
 from utils.paginators import LyricsPaginatorSource
 
 if TYPE_CHECKING:
@@ -23,6 +22,17 @@ class Utility(commands.Cog):
     def __init__(self, bot: FumeTune):
         self.bot: FumeTune = bot
 
+        self.lyrics: Optional[LyricsService] = None
+
+    async def cog_load(self):
+        self.lyrics = LyricsService(
+            self.bot.config.GENIUS_API_TOKEN,
+            max_entries=self.bot.config.LYRICS_CACHE_SIZE,
+        )
+
+    async def cog_unload(self):
+        self.lyrics.close()
+
     @app_commands.command(name="lyrics")
     @app_commands.checks.dynamic_cooldown(cooldown_level_1)
     @app_commands.guild_only()
@@ -42,34 +52,15 @@ class Utility(commands.Cog):
         # noinspection PyUnresolvedReferences
         await ctx.response.defer(thinking=True)
 
-        genius = Genius(
-            self.bot.config.GENIUS_API_TOKEN,
-            timeout=10.0,
-            remove_section_headers=True,
-            retries=3,
-            verbose=False,
-        )
-        song = genius.search_song(title, artist)
-
-        if not song:
-            return await ctx.edit_original_response(
-                content=f"No lyrics found for `{title}`."
-            )
-
-        w = textwrap.TextWrapper(
-            width=750, break_long_words=False, replace_whitespace=False
-        )
-
-        try:
-            entries = w.wrap(text=song.lyrics)
+        song = await self.lyrics.search(title, artist)
 
-        except AttributeError:
+        if not song or not song.pages:
             return await ctx.edit_original_response(
                 content=f"No lyrics found for `{title}`."
             )
 
         pages = LyricsPaginatorSource(
-            entries=entries, title=song.title, artist=song.artist, ctx=ctx
+            entries=song.pages, title=song.title, artist=song.artist, ctx=ctx
         )
         paginator = ViewMenuPages(
             source=pages,
@@ -96,7 +87,20 @@ class Utility(commands.Cog):
         # noinspection PyUnresolvedReferences
         await ctx.response.defer(thinking=True)
 
-        member = ctx.guild.get_member(member.id)
+        if cached := ctx.guild.get_member(member.id):
+            member = cached
+
+        else:
+            # Not cached (low memory mode), so ask the gateway for the presence.
+            try:
+                found = await ctx.guild.query_members(
+                    user_ids=[member.id], presences=True, cache=False
+                )
+
+            except asyncio.TimeoutError:
+                found = list()
+
+            member = found[0] if found else member
 
         for activity in member.activities:
             if isinstance(activity, discord.Spotify):
@@ -1,12 +1,21 @@
 from __future__ import annotations
 
+from typing import Optional
+
 import sys
+import json
+import time
+import queue
+import signal
 import asyncio
 import logging
 import contextlib
+import multiprocessing
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 import click
+import aiohttp
 import pymysql
 import aiomysql
 
@@ -14,6 +23,8 @@ import discord
 
 from bot import FumeTune
 from utils.config import Config
+from utils.cluster import ClusterInfo, ClusterStats, split_shards
+from utils.watchdog import LoopWatchdog
 
 if sys.platform == "win32":
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
@@ -33,6 +44,10 @@ async def create_pool() -> aiomysql.Pool:
         password=Config.DB_PASSWORD,
         db=Config.DB_NAME,
         autocommit=True,
+        minsize=Config.DB_POOL_MIN_SIZE,
+        maxsize=Config.DB_POOL_MAX_SIZE,
+        pool_recycle=Config.DB_POOL_RECYCLE,
+        connect_timeout=Config.DB_CONNECT_TIMEOUT,
     )
 
 
@@ -46,27 +61,67 @@ class RemoveNoise(logging.Filter):
         return True
 
 
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "time": self.formatTime(record, "%Y-%m-%d %H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class DeferredQueueHandler(QueueHandler):
+    # The stock prepare() formats the record on the calling thread and drops
+    # exc_info; pass it on untouched so the listener's formatters do the work.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
 @contextlib.contextmanager
-def setup_logging():
+def setup_logging(name: str = "fumetune"):
     log = logging.getLogger()
+    listener = None
 
     try:
-        # Console handler (coloured automatically when attached to a TTY).
+        # Console handler (coloured automatically when attached to a TTY). discord.py
+        # picks the formatter; the handler itself is then moved behind the queue.
         stream_handler = logging.StreamHandler()
         discord.utils.setup_logging(handler=stream_handler, level=logging.INFO)
+        log.removeHandler(stream_handler)
 
-        # File handler, mirroring the console with the same format discord uses.
-        dt_fmt = "%Y-%m-%d %H:%M:%S"
-        formatter = logging.Formatter(
-            "[{asctime}] [{levelname:<8}] {name}: {message}", dt_fmt, style="{"
-        )
-        file_handler = logging.FileHandler(
-            filename=f"logs/fumetune-{datetime.now().strftime('%Y-%m-%d~%H-%M-%S')}.log",
+        # File handler, mirroring the console with the same format discord uses,
+        # or one JSON object per line when LOG_FORMAT=json.
+        if Config.LOG_FORMAT == "json":
+            formatter = JSONFormatter()
+
+        else:
+            dt_fmt = "%Y-%m-%d %H:%M:%S"
+            formatter = logging.Formatter(
+                "[{asctime}] [{levelname:<8}] {name}: {message}", dt_fmt, style="{"
+            )
+
+        file_handler = RotatingFileHandler(
+            filename=f"logs/{name}-{datetime.now().strftime('%Y-%m-%d~%H-%M-%S')}.log",
             encoding="utf-8",
-            mode="w",
+            maxBytes=Config.LOG_MAX_BYTES,
+            backupCount=Config.LOG_BACKUP_COUNT,
         )
         file_handler.setFormatter(formatter)
-        log.addHandler(file_handler)
+
+        # Records are only enqueued on the event loop; formatting and all console
+        # and disk I/O happen on the listener's thread.
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        listener = QueueListener(
+            log_queue, stream_handler, file_handler, respect_handler_level=True
+        )
+        log.addHandler(DeferredQueueHandler(log_queue))
+        listener.start()
 
         logging.getLogger("discord").setLevel(logging.INFO)
         logging.getLogger("discord.http").setLevel(logging.WARNING)
@@ -78,13 +133,22 @@ def setup_logging():
         yield
 
     finally:
+        if listener:
+            listener.stop()
+
+            for _handler in listener.handlers:
+                _handler.close()
+
         handlers = log.handlers[:]
         for _handler in handlers:
             _handler.close()
             log.removeHandler(_handler)
 
 
-async def run_bot():
+async def run_bot(
+    cluster: Optional[ClusterInfo] = None,
+    cluster_stats: Optional[ClusterStats] = None,
+):
     log = logging.getLogger()
 
     try:
@@ -94,18 +158,165 @@ async def run_bot():
         click.echo("Could not set up MySQL. Exiting.", file=sys.stderr)
         return log.exception("Could not set up MySQL. Exiting...")
 
-    async with FumeTune() as bot:
+    watchdog = LoopWatchdog(threshold=Config.WATCHDOG_THRESHOLD)
+    watchdog.start()
+
+    async with FumeTune(cluster=cluster, cluster_stats=cluster_stats) as bot:
         bot.log = log
         bot.pool = pool
-        await bot.start()
+        bot.watchdog = watchdog
+
+        closing: list[asyncio.Task] = list()
+
+        if sys.platform != "win32":
+            # Shut down cleanly (saving player snapshots) when the launcher or
+            # the process manager stops us.
+            asyncio.get_running_loop().add_signal_handler(
+                signal.SIGTERM,
+                lambda: closing.append(asyncio.create_task(bot.close())),
+            )
+
+        try:
+            await bot.start()
+
+        finally:
+            # bot.start() returns as soon as the gateway closes, halfway through
+            # FumeTune.close; wait for the rest of it before asyncio.run exits.
+            if closing:
+                await closing[0]
+
+            watchdog.stop()
+
+
+async def fetch_shard_count() -> int:
+    async with aiohttp.ClientSession() as session:
+        async with session.get(
+            "https://discord.com/api/v10/gateway/bot",
+            headers={"Authorization": f"Bot {Config.TOKEN}"},
+        ) as resp:
+            resp.raise_for_status()
+            data = await resp.json()
+
+    return data["shards"]
+
+
+def run_cluster(cluster: ClusterInfo, shared) -> None:
+    # Entry point of each cluster process; spawned, so nothing is inherited.
+    with setup_logging(name=f"fumetune-cluster-{cluster.id}"):
+        logging.getLogger().info(
+            f"Starting cluster {cluster.id} with shards "
+            f"{cluster.shard_ids[0]}-{cluster.shard_ids[-1]} of {cluster.shard_count}."
+        )
+        asyncio.run(run_bot(cluster=cluster, cluster_stats=ClusterStats(shared)))
+
+
+def supervise(clusters: int, stagger: float = 5.0, max_backoff: float = 300.0):
+    """Run one process per cluster and restart any that exit, with backoff."""
+    log = logging.getLogger()
+
+    shard_count = Config.SHARD_COUNT or asyncio.run(fetch_shard_count())
+    clusters = min(clusters, shard_count)
+
+    infos = [
+        ClusterInfo(
+            id=index, count=clusters, shard_ids=shard_ids, shard_count=shard_count
+        )
+        for index, shard_ids in enumerate(split_shards(shard_count, clusters))
+    ]
+
+    log.info(f"Launching {clusters} cluster(s) for {shard_count} shard(s).")
+
+    context = multiprocessing.get_context("spawn")
+    manager = context.Manager()
+    shared = manager.dict()
+
+    processes: dict[int, tuple[multiprocessing.Process, float]] = dict()
+    failures: dict[int, int] = {info.id: 0 for info in infos}
+    restart_at: dict[int, float] = dict()
+
+    def start(info: ClusterInfo) -> None:
+        process = context.Process(
+            target=run_cluster, args=(info, shared), name=f"cluster-{info.id}"
+        )
+        process.start()
+        processes[info.id] = (process, time.monotonic())
+
+    def stop(*_) -> None:
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+
+    try:
+        for info in infos:
+            start(info)
+
+            # Identifying many shards from every process at once trips Discord's
+            # session start rate limit.
+            time.sleep(stagger)
+
+        while True:
+            time.sleep(1.0)
+            now = time.monotonic()
+
+            for info in infos:
+                if info.id in restart_at:
+                    if now >= restart_at[info.id]:
+                        del restart_at[info.id]
+                        start(info)
+
+                    continue
+
+                process, started = processes[info.id]
+
+                if process.is_alive():
+                    continue
+
+                # Only clusters that die soon after starting count towards backoff.
+                failures[info.id] = (
+                    0 if now - started > 600 else failures[info.id] + 1
+                )
+                delay = min(stagger * 2 ** failures[info.id], max_backoff)
+                restart_at[info.id] = now + delay
+
+                log.warning(
+                    f"Cluster {info.id} exited with code {process.exitcode}; "
+                    f"restarting in {delay:.0f}s."
+                )
+
+    except (KeyboardInterrupt, SystemExit):
+        log.info("Stopping all clusters.")
+
+    finally:
+        for process, _ in processes.values():
+            if process.is_alive():
+                process.terminate()
+
+        for process, _ in processes.values():
+            process.join(timeout=30)
+
+            if process.is_alive():
+                process.kill()
+
+        manager.shutdown()
 
 
 @click.group(invoke_without_command=True, options_metavar="[options]")
+@click.option(
+    "--clusters",
+    default=1,
+    show_default=True,
+    help="Number of processes to split the shards across.",
+)
 @click.pass_context
-def main(ctx):
+def main(ctx, clusters: int):
     if ctx.invoked_subcommand is None:
-        with setup_logging():
-            asyncio.run(run_bot())
+        if clusters > 1:
+            with setup_logging(name="fumetune-launcher"):
+                supervise(clusters)
+
+        else:
+            with setup_logging():
+                asyncio.run(run_bot())
 
 
 if __name__ == "__main__":
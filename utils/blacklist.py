@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from typing import Callable, Optional, Awaitable
+
+import zlib
+import logging
+from datetime import datetime
+
+import pymysql
+import aiomysql
+from pymysql.constants import ER
+
+log = logging.getLogger("fumetune.blacklist")
+
+
+def _crc(entity_id: int) -> int:
+    # Mirrors MySQL's CRC32() over the decimal form of the id, so the local
+    # checksum can be compared with the one computed by the database.
+    return zlib.crc32(str(entity_id).encode())
+
+
+class BlacklistSync:
+    """An in-memory blacklist kept in step with its table by delta syncs."""
+
+    def __init__(
+        self,
+        fetch_all: Callable[[aiomysql.Pool], Awaitable[set[int]]],
+        fetch_since: Callable[
+            [aiomysql.Pool, datetime], Awaitable[list[tuple[int, datetime]]]
+        ],
+        fetch_state: Callable[
+            [aiomysql.Pool], Awaitable[tuple[int, int, Optional[datetime]]]
+        ],
+    ):
+        self._fetch_all = fetch_all
+        self._fetch_since = fetch_since
+        self._fetch_state = fetch_state
+
+        self.ids: set[int] = set()
+        self.checksum: int = 0
+        self.watermark: Optional[datetime] = None
+
+        # Cleared if the table predates its CREATED_AT column.
+        self.incremental: bool = True
+
+    async def sync(self, pool: aiomysql.Pool, *, full: bool = False) -> bool:
+        """Bring :attr:`ids` up to date, returning ``True`` if a full resync ran."""
+        if not self.incremental:
+            await self._reload(pool)
+            # Every sync is a full reload; there is no drift to report.
+            return False
+
+        try:
+            return await self._sync(pool, full=full)
+
+        except pymysql.err.MySQLError as e:
+            if e.args[0] != ER.BAD_FIELD_ERROR:
+                raise
+
+            log.warning(
+                "A blacklist table has no CREATED_AT column, so it is reloaded in "
+                "full on every sync. Add it to user_blacklist and guild_blacklist "
+                "with: alter table ... add CREATED_AT timestamp not null default "
+                "current_timestamp;"
+            )
+            self.incremental = False
+
+            await self._reload(pool)
+            return False
+
+    async def _sync(self, pool: aiomysql.Pool, *, full: bool) -> bool:
+        if full or self.watermark is None:
+            await self._full_sync(pool)
+            return True
+
+        for entity_id, created_at in await self._fetch_since(pool, self.watermark):
+            if entity_id not in self.ids:
+                self.ids.add(entity_id)
+                self.checksum ^= _crc(entity_id)
+
+            if created_at and created_at > self.watermark:
+                self.watermark = created_at
+
+        # Deletions (e.g. an appeal) never show up in a delta; the count and
+        # checksum catch them.
+        count, checksum, _ = await self._fetch_state(pool)
+
+        if count != len(self.ids) or checksum != self.checksum:
+            await self._full_sync(pool)
+            return True
+
+        return False
+
+    async def _full_sync(self, pool: aiomysql.Pool) -> None:
+        _, _, watermark = await self._fetch_state(pool)
+        await self._reload(pool)
+
+        self.checksum = 0
+        for entity_id in self.ids:
+            self.checksum ^= _crc(entity_id)
+
+        self.watermark = watermark or datetime.min
+
+    async def _reload(self, pool: aiomysql.Pool) -> None:
+        ids = await self._fetch_all(pool)
+
+        # Update the existing set in place; other code holds a reference to it.
+        self.ids.intersection_update(ids)
+        self.ids.update(ids)
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from typing import Any, Hashable, Iterator, Optional
+
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """A bounded LRU mapping whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize: int = maxsize
+        self.ttl: float = ttl
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and entry[0] > time.monotonic()
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        entry = self._data.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return default
+
+        if entry[0] <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+
+        self._data[key] = (expires, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def items(self) -> Iterator[tuple[Hashable, Any, float]]:
+        """Yield ``(key, value, remaining_ttl)`` for every live entry."""
+        now = time.monotonic()
+
+        for key, (expires, value) in list(self._data.items()):
+            if expires > now:
+                yield key, value, expires - now
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
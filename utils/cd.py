@@ -8,13 +8,25 @@ from discord import app_commands
 from utils.db import is_premium_user
 
 
+async def _is_premium(ctx: discord.Interaction) -> bool:
+    # Premium status is served from the bot's in-process cache, which is warmed
+    # from the users table at startup; the database is only consulted on a miss.
+    premium = ctx.client.premium_cache.get(ctx.user.id)
+
+    if premium is None:
+        premium = await is_premium_user(ctx.client.pool, ctx.user.id)
+        ctx.client.premium_cache.set(ctx.user.id, premium)
+
+    return premium
+
+
 async def cooldown_level_0(
     ctx: discord.Interaction,
 ) -> Optional[app_commands.Cooldown]:
     if ctx.client.owner == ctx.user:
         return
 
-    elif await is_premium_user(ctx.client.pool, ctx.user.id):
+    elif await _is_premium(ctx):
         return app_commands.Cooldown(1, 2.0)
 
     else:
@@ -27,7 +39,7 @@ async def cooldown_level_1(
     if ctx.client.owner == ctx.user:
         return
 
-    elif await is_premium_user(ctx.client.pool, ctx.user.id):
+    elif await _is_premium(ctx):
         return app_commands.Cooldown(1, 60.0)
 
     else:
@@ -16,6 +16,11 @@ def initial_checks(ctx: discord.Interaction) -> bool:
     player: Player = cast(Player, ctx.guild.voice_client)
 
     if not player or not player.connected:
+        if not ctx.client.music_ready.is_set():
+            raise app_commands.CheckFailure(
+                "Music is still starting up, please try again in a moment."
+            )
+
         return True
 
     if player.ctx and player.ctx.channel != ctx.channel:
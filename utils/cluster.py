@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from typing import Any, NamedTuple
+
+import asyncio
+
+
+class ClusterInfo(NamedTuple):
+    id: int
+    count: int
+    shard_ids: list[int]
+    shard_count: int
+
+
+def split_shards(shard_count: int, clusters: int) -> list[list[int]]:
+    """Split ``range(shard_count)`` into ``clusters`` contiguous, near-even runs."""
+    size, extra = divmod(shard_count, clusters)
+    ranges = list()
+    start = 0
+
+    for index in range(clusters):
+        end = start + size + (1 if index < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+
+    return ranges
+
+
+def cluster_for_guild(guild_id: int, shard_count: int, clusters: int) -> int:
+    """The cluster whose shards receive ``guild_id``'s events."""
+    shard_id = (guild_id >> 22) % shard_count
+
+    for index, shard_ids in enumerate(split_shards(shard_count, clusters)):
+        if shard_id in shard_ids:
+            return index
+
+    return 0
+
+
+class ClusterStats:
+    """Per-cluster counts, shared between cluster processes through a manager dict."""
+
+    def __init__(self, shared: Any):
+        self._shared = shared
+
+    async def publish(self, cluster_id: int, counts: dict[str, int]) -> None:
+        # Calls on the manager's proxy are blocking round trips to the launcher.
+        await asyncio.to_thread(self._shared.__setitem__, cluster_id, counts)
+
+    async def totals(self) -> dict[str, int]:
+        clusters = await asyncio.to_thread(self._shared.copy)
+        totals: dict[str, int] = dict()
+
+        for counts in clusters.values():
+            for key, value in counts.items():
+                totals[key] = totals.get(key, 0) + value
+
+        return totals
@@ -14,10 +14,13 @@ load_dotenv(Path(__file__).resolve().parents[1] / ".env")
 
 class Config:
     @staticmethod
-    def _get_from_env(name: str) -> str:
+    def _get_from_env(name: str, default: str | None = None) -> str:
         try:
             return os.environ[name]
         except KeyError:
+            if default is not None:
+                return default
+
             raise RuntimeError(
                 f"Missing required config {name!r} "
                 "(set it in .env for local development, or Doppler in production)"
@@ -36,17 +39,67 @@ class Config:
 
     COMMUNITY_GUILD_ID: int = int(_get_from_env("COMMUNITY_GUILD_ID"))
 
+    SHARD_COUNT: int = int(_get_from_env("SHARD_COUNT", "0"))
+
     DB_HOST: str = _get_from_env("DB_HOST")
     DB_PORT: int = int(_get_from_env("DB_PORT"))
     DB_NAME: str = _get_from_env("DB_NAME")
     DB_USER: str = _get_from_env("DB_USER")
     DB_PASSWORD: str = _get_from_env("DB_PASSWORD")
 
+    DB_POOL_MIN_SIZE: int = int(_get_from_env("DB_POOL_MIN_SIZE", "2"))
+    DB_POOL_MAX_SIZE: int = int(_get_from_env("DB_POOL_MAX_SIZE", "10"))
+    # Seconds before an idle connection is replaced; MySQL drops idle connections
+    # after wait_timeout (8 hours by default, often much less on managed hosts).
+    DB_POOL_RECYCLE: int = int(_get_from_env("DB_POOL_RECYCLE", "3600"))
+    DB_CONNECT_TIMEOUT: float = float(_get_from_env("DB_CONNECT_TIMEOUT", "10"))
+
+    # Cache only members in voice or seen in a recent interaction, and don't chunk
+    # guilds. Presences are then requested per member when a command needs them.
+    LOW_MEMORY_MODE: bool = _get_from_env("LOW_MEMORY_MODE", "false").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    RECENT_MEMBER_CACHE_SIZE: int = int(
+        _get_from_env("RECENT_MEMBER_CACHE_SIZE", "10000")
+    )
+    RECENT_MEMBER_CACHE_TTL: float = float(
+        _get_from_env("RECENT_MEMBER_CACHE_TTL", "900")
+    )
+
     MUSIC_NODES: list = json.loads(_get_from_env("MUSIC_NODES"))
 
+    NODE_HYSTERESIS: float = float(_get_from_env("NODE_HYSTERESIS", "0.25"))
+    # Seconds to wait for each node at startup before leaving it to connect in
+    # the background.
+    NODE_CONNECT_TIMEOUT: float = float(_get_from_env("NODE_CONNECT_TIMEOUT", "10"))
+
+    # 0 disables the metrics endpoint; clusters listen on this port plus their id.
+    METRICS_HOST: str = _get_from_env("METRICS_HOST", "127.0.0.1")
+    METRICS_PORT: int = int(_get_from_env("METRICS_PORT", "0"))
+
+    # Seconds the event loop may be blocked before the stall is reported.
+    WATCHDOG_THRESHOLD: float = float(_get_from_env("WATCHDOG_THRESHOLD", "0.25"))
+
     GENIUS_API_TOKEN: str = _get_from_env("GENIUS_API_TOKEN")
     TOPGG_TOKEN: str = _get_from_env("TOPGG_TOKEN")
 
+    LOG_FORMAT: str = _get_from_env("LOG_FORMAT", "text").lower()
+    LOG_MAX_BYTES: int = int(_get_from_env("LOG_MAX_BYTES", str(32 * 1024 * 1024)))
+    LOG_BACKUP_COUNT: int = int(_get_from_env("LOG_BACKUP_COUNT", "5"))
+
+    PREMIUM_CACHE_SIZE: int = int(_get_from_env("PREMIUM_CACHE_SIZE", "10000"))
+    PREMIUM_CACHE_TTL: float = float(_get_from_env("PREMIUM_CACHE_TTL", "600"))
+
+    SEARCH_CACHE_SIZE: int = int(_get_from_env("SEARCH_CACHE_SIZE", "500"))
+    SEARCH_CACHE_TTL: float = float(_get_from_env("SEARCH_CACHE_TTL", "3600"))
+    SEARCH_CACHE_NEGATIVE_TTL: float = float(
+        _get_from_env("SEARCH_CACHE_NEGATIVE_TTL", "300")
+    )
+
+    LYRICS_CACHE_SIZE: int = int(_get_from_env("LYRICS_CACHE_SIZE", "2000"))
+
     INITIAL_EXTENSIONS: list[str] = [
         item.strip()
         for item in _get_from_env("INITIAL_EXTENSIONS").split(",")
@@ -1,16 +1,88 @@
 from __future__ import annotations
 
+from typing import Iterable, Iterator, Optional, Sequence, AsyncIterator
+
+import time
+import contextlib
+from datetime import datetime
+
 import aiomysql
 
+from utils.metrics import registry
+
+POOL_ACQUIRE_WAIT = registry.histogram(
+    "fumetune_db_pool_acquire_seconds",
+    "Time spent waiting for a MySQL connection from the pool.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+
+
+@contextlib.asynccontextmanager
+async def acquire(pool: aiomysql.Pool) -> AsyncIterator[aiomysql.Connection]:
+    start = time.perf_counter()
 
-async def guild_exists(pool: aiomysql.Pool, guild_id: int):
     async with pool.acquire() as conn:
+        POOL_ACQUIRE_WAIT.observe(time.perf_counter() - start)
+        yield conn
+
+
+# Shared by every query below. aiomysql has no server-side prepared statements;
+# arguments are always passed separately and escaped by the driver.
+
+
+async def _fetchone(
+    pool: aiomysql.Pool, query: str, args: Optional[Sequence] = None
+) -> Optional[tuple]:
+    async with acquire(pool) as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(query, args)
+
+            return await cur.fetchone()
+
+
+async def _fetchall(
+    pool: aiomysql.Pool, query: str, args: Optional[Sequence] = None
+) -> list[tuple]:
+    async with acquire(pool) as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(query, args)
+
+            return list(await cur.fetchall())
+
+
+async def _execute(
+    pool: aiomysql.Pool, query: str, args: Optional[Sequence] = None
+) -> int:
+    async with acquire(pool) as conn:
         async with conn.cursor() as cur:
-            await cur.execute(
-                "select GUILD_ID from guilds where GUILD_ID = %s;", (guild_id,)
-            )
+            return await cur.execute(query, args)
 
-            res = await cur.fetchone()
+
+def _chunks(values: Iterable[int], size: int) -> Iterator[list[int]]:
+    values = list(values)
+
+    for index in range(0, len(values), size):
+        yield values[index : index + size]
+
+
+async def check_health(pool: aiomysql.Pool) -> float:
+    """Round-trip a trivial query and return its latency in seconds."""
+    start = time.perf_counter()
+
+    async with acquire(pool) as conn:
+        await conn.ping(reconnect=True)
+
+        async with conn.cursor() as cur:
+            await cur.execute("select 1;")
+            await cur.fetchone()
+
+    return time.perf_counter() - start
+
+
+async def guild_exists(pool: aiomysql.Pool, guild_id: int):
+    res = await _fetchone(
+        pool, "select GUILD_ID from guilds where GUILD_ID = %s;", (guild_id,)
+    )
 
     if not res:
         return False
@@ -19,21 +91,36 @@ async def guild_exists(pool: aiomysql.Pool, guild_id: int):
 
 
 async def add_guild(pool: aiomysql.Pool, guild_id: int):
-    async with pool.acquire() as conn:
-        async with conn.cursor() as cur:
-            await cur.execute(
-                "insert into guilds (GUILD_ID) values (%s);", (guild_id,)
-            )
+    await _execute(
+        pool, "insert ignore into guilds (GUILD_ID) values (%s);", (guild_id,)
+    )
 
 
-async def is_premium_user(pool: aiomysql.Pool, user_id: int):
-    async with pool.acquire() as conn:
+async def get_guild_ids(pool: aiomysql.Pool) -> set[int]:
+    return {row[0] for row in await _fetchall(pool, "select GUILD_ID from guilds;")}
+
+
+async def add_guilds(
+    pool: aiomysql.Pool, guild_ids: Iterable[int], chunk_size: int = 1000
+) -> int:
+    added = 0
+
+    async with acquire(pool) as conn:
         async with conn.cursor() as cur:
-            await cur.execute(
-                "select PREMIUM from users where USER_ID = %s;", (user_id,)
-            )
+            # executemany turns each chunk into a single multi-row insert.
+            for chunk in _chunks(guild_ids, chunk_size):
+                added += await cur.executemany(
+                    "insert ignore into guilds (GUILD_ID) values (%s);",
+                    [(guild_id,) for guild_id in chunk],
+                )
+
+    return added
 
-            res = await cur.fetchone()
+
+async def is_premium_user(pool: aiomysql.Pool, user_id: int):
+    res = await _fetchone(
+        pool, "select PREMIUM from users where USER_ID = %s;", (user_id,)
+    )
 
     if not res or not res[0]:
         return False
@@ -41,14 +128,34 @@ async def is_premium_user(pool: aiomysql.Pool, user_id: int):
     return True
 
 
-async def is_premium_guild(pool: aiomysql.Pool, user_id: int):
-    async with pool.acquire() as conn:
-        async with conn.cursor() as cur:
-            await cur.execute(
-                "select PREMIUM from guilds where GUILD_ID = %s;", (user_id,)
-            )
+async def is_premium_users(
+    pool: aiomysql.Pool, user_ids: Iterable[int], chunk_size: int = 1000
+) -> set[int]:
+    """Which of ``user_ids`` are premium, in one query per ``chunk_size`` IDs."""
+    premium = set()
+
+    for chunk in _chunks(user_ids, chunk_size):
+        rows = await _fetchall(
+            pool,
+            "select USER_ID from users where PREMIUM = 1 and USER_ID in "
+            f"({', '.join(['%s'] * len(chunk))});",
+            chunk,
+        )
+        premium.update(row[0] for row in rows)
+
+    return premium
 
-            res = await cur.fetchone()
+
+async def get_premium_users(pool: aiomysql.Pool) -> set[int]:
+    rows = await _fetchall(pool, "select USER_ID from users where PREMIUM = 1;")
+
+    return {row[0] for row in rows}
+
+
+async def is_premium_guild(pool: aiomysql.Pool, user_id: int):
+    res = await _fetchone(
+        pool, "select PREMIUM from guilds where GUILD_ID = %s;", (user_id,)
+    )
 
     if not res or not res[0]:
         return False
@@ -57,13 +164,9 @@ async def is_premium_guild(pool: aiomysql.Pool, user_id: int):
 
 
 async def is_blacklisted_user(pool: aiomysql.Pool, user_id: int):
-    async with pool.acquire() as conn:
-        async with conn.cursor() as cur:
-            await cur.execute(
-                "select USER_ID from user_blacklist where USER_ID = %s;", (user_id,)
-            )
-
-            res = await cur.fetchone()
+    res = await _fetchone(
+        pool, "select USER_ID from user_blacklist where USER_ID = %s;", (user_id,)
+    )
 
     if not res or not res[0]:
         return False
@@ -72,14 +175,11 @@ async def is_blacklisted_user(pool: aiomysql.Pool, user_id: int):
 
 
 async def is_blacklisted_guild(pool: aiomysql.Pool, guild_id: int):
-    async with pool.acquire() as conn:
-        async with conn.cursor() as cur:
-            await cur.execute(
-                "select GUILD_ID from guild_blacklist where GUILD_ID = %s;",
-                (guild_id,),
-            )
-
-            res = await cur.fetchone()
+    res = await _fetchone(
+        pool,
+        "select GUILD_ID from guild_blacklist where GUILD_ID = %s;",
+        (guild_id,),
+    )
 
     if not res or not res[0]:
         return False
@@ -88,16 +188,56 @@ async def is_blacklisted_guild(pool: aiomysql.Pool, guild_id: int):
 
 
 async def get_blacklisted_users(pool: aiomysql.Pool) -> set[int]:
-    async with pool.acquire() as conn:
-        async with conn.cursor() as cur:
-            await cur.execute("select USER_ID from user_blacklist;")
+    rows = await _fetchall(pool, "select USER_ID from user_blacklist;")
 
-            return {row[0] for row in await cur.fetchall()}
+    return {row[0] for row in rows}
 
 
 async def get_blacklisted_guilds(pool: aiomysql.Pool) -> set[int]:
-    async with pool.acquire() as conn:
-        async with conn.cursor() as cur:
-            await cur.execute("select GUILD_ID from guild_blacklist;")
+    rows = await _fetchall(pool, "select GUILD_ID from guild_blacklist;")
+
+    return {row[0] for row in rows}
+
+
+async def get_blacklisted_users_since(
+    pool: aiomysql.Pool, since: datetime
+) -> list[tuple[int, datetime]]:
+    return await _fetchall(
+        pool,
+        "select USER_ID, CREATED_AT from user_blacklist where CREATED_AT >= %s;",
+        (since,),
+    )
+
+
+async def get_blacklisted_guilds_since(
+    pool: aiomysql.Pool, since: datetime
+) -> list[tuple[int, datetime]]:
+    return await _fetchall(
+        pool,
+        "select GUILD_ID, CREATED_AT from guild_blacklist where CREATED_AT >= %s;",
+        (since,),
+    )
+
+
+async def get_user_blacklist_state(
+    pool: aiomysql.Pool,
+) -> tuple[int, int, Optional[datetime]]:
+    count, checksum, watermark = await _fetchone(
+        pool,
+        "select count(*), coalesce(bit_xor(crc32(USER_ID)), 0), max(CREATED_AT) "
+        "from user_blacklist;",
+    )
+
+    return int(count), int(checksum), watermark
+
+
+async def get_guild_blacklist_state(
+    pool: aiomysql.Pool,
+) -> tuple[int, int, Optional[datetime]]:
+    count, checksum, watermark = await _fetchone(
+        pool,
+        "select count(*), coalesce(bit_xor(crc32(GUILD_ID)), 0), max(CREATED_AT) "
+        "from guild_blacklist;",
+    )
 
-            return {row[0] for row in await cur.fetchall()}
+    return int(count), int(checksum), watermark
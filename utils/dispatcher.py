@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Optional
+
+import time
+import asyncio
+import logging
+
+import discord
+
+log = logging.getLogger("fumetune.dispatcher")
+
+
+class _Outgoing:
+    __slots__ = ("kwargs", "edit", "queued_at")
+
+    def __init__(self, kwargs: dict[str, Any], edit: bool):
+        self.kwargs: dict[str, Any] = kwargs
+        self.edit: bool = edit
+        self.queued_at: float = time.monotonic()
+
+
+class MessageDispatcher:
+    """Sends a player's channel messages one at a time, at most one per interval."""
+
+    def __init__(
+        self,
+        channel: Callable[[], Optional[discord.abc.Messageable]],
+        interval: float = 1.0,
+        max_age: float = 15.0,
+        max_pending: int = 5,
+    ):
+        self.channel: Callable[[], Optional[discord.abc.Messageable]] = channel
+        self.interval: float = interval
+        self.max_age: float = max_age
+        self.max_pending: int = max_pending
+
+        self.dropped: int = 0
+
+        self._pending: dict[str, _Outgoing] = dict()
+        self._sent: dict[str, discord.Message] = dict()
+        self._task: Optional[asyncio.Task] = None
+
+    def post(self, key: str, *, edit: bool = False, **kwargs: Any) -> None:
+        """Queue a message; ``kwargs`` are passed on to ``send``/``edit``."""
+        # A newer message under the same key replaces the waiting one, so a
+        # burst of skips results in a single notice.
+        self._pending.pop(key, None)
+        self._pending[key] = _Outgoing(kwargs, edit)
+
+        # Edited messages always reflect the latest state and are kept.
+        droppable = [k for k, o in self._pending.items() if not o.edit]
+
+        for stale in droppable[: max(0, len(droppable) - self.max_pending)]:
+            del self._pending[stale]
+            self.dropped += 1
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def discard(self, *keys: str) -> None:
+        """Drop waiting messages that have been superseded."""
+        for key in keys:
+            self._pending.pop(key, None)
+
+    def close(self) -> None:
+        self._pending.clear()
+        self._sent.clear()
+
+        if self._task:
+            self._task.cancel()
+
+    async def _run(self) -> None:
+        while self._pending:
+            key = next(iter(self._pending))
+            outgoing = self._pending.pop(key)
+
+            # Stale by the time a slot frees up; not worth sending any more.
+            if time.monotonic() - outgoing.queued_at > self.max_age:
+                self.dropped += 1
+                continue
+
+            try:
+                await self._deliver(key, outgoing)
+
+            except Exception as e:
+                log.error(f"Failed to send the {key!r} message.", exc_info=e)
+
+            await asyncio.sleep(self.interval)
+
+    async def _deliver(self, key: str, outgoing: _Outgoing) -> None:
+        message = self._sent.get(key) if outgoing.edit else None
+
+        if message is not None:
+            try:
+                await message.edit(**outgoing.kwargs)
+                return
+
+            except (discord.NotFound, discord.Forbidden):
+                del self._sent[key]
+
+        channel = self.channel()
+
+        if channel is None:
+            return
+
+        try:
+            message = await channel.send(**outgoing.kwargs)
+
+        except discord.Forbidden:
+            return
+
+        if outgoing.edit:
+            self._sent[key] = message
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional
+
+import asyncio
+import hashlib
+import contextlib
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import discord
+
+if TYPE_CHECKING:
+    from bot import FumeTune
+
+
+def fingerprint(*parts: object) -> str:
+    return hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()[:12]
+
+
+class _Report:
+    __slots__ = ("title", "fields", "path", "count", "first_seen")
+
+    def __init__(self, title: str, fields: dict[str, str], path: str):
+        self.title: str = title
+        self.fields: dict[str, str] = fields
+        self.path: str = path
+        self.count: int = 1
+        self.first_seen: datetime = datetime.now()
+
+
+class ErrorSink:
+    """Writes error reports off the event loop and posts them as webhook digests."""
+
+    def __init__(
+        self,
+        bot: FumeTune,
+        interval: float = 60.0,
+        max_embeds: int = 10,
+        max_pending: int = 500,
+    ):
+        self.bot: FumeTune = bot
+        self.interval: float = interval
+        self.max_embeds: int = max_embeds
+        self.max_pending: int = max_pending
+
+        self.dropped: int = 0
+        self.webhook_failures: int = 0
+
+        self._pending: dict[str, _Report] = dict()
+        self._lines: list[tuple[str, str]] = list()
+        self._written: dict[str, set[str]] = dict()
+
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="error-sink"
+        )
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+
+        await self._flush_files()
+        await self._send_digest()
+
+        self._executor.shutdown(wait=True)
+
+    def report(
+        self,
+        category: str,
+        key: str,
+        title: str,
+        fields: dict[str, str],
+        detail: str,
+    ) -> str:
+        """Queue a report and return the path of the log file it is written to."""
+        now = datetime.now()
+        path = f"logs/{category}/{now.strftime('%Y-%m-%d')}.log"
+        header = f"[{now.strftime('%Y-%m-%d %H:%M:%S')}] [{key}] {title}"
+
+        # The full detail goes in once per file; repeats only add a header line.
+        written = self._written.setdefault(path, set())
+
+        if key in written:
+            self._lines.append((path, f"{header} (repeat)\n"))
+
+        else:
+            written.add(key)
+            self._lines.append((path, f"{header}\n{detail.rstrip()}\n\n"))
+
+        # Coalesced by fingerprint into the next digest.
+        if key in self._pending:
+            self._pending[key].count += 1
+
+        elif len(self._pending) < self.max_pending:
+            self._pending[key] = _Report(title=title, fields=fields, path=path)
+
+        else:
+            self.dropped += 1
+
+        return path
+
+    async def _run(self) -> None:
+        elapsed = 0.0
+
+        while True:
+            await asyncio.sleep(1.0)
+            elapsed += 1.0
+
+            try:
+                await self._flush_files()
+
+                if elapsed >= self.interval:
+                    elapsed = 0.0
+                    await self._send_digest()
+
+            except Exception as e:
+                self.bot.log.error("Failed to flush the error sink.", exc_info=e)
+
+    async def _flush_files(self) -> None:
+        if not self._lines:
+            return
+
+        lines, self._lines = self._lines, list()
+
+        # Only today's files can still receive lines; forget older ones.
+        today = datetime.now().strftime("%Y-%m-%d")
+        for path in [p for p in self._written if not p.endswith(f"{today}.log")]:
+            del self._written[path]
+
+        await asyncio.get_running_loop().run_in_executor(
+            self._executor, self._write, lines
+        )
+
+    @staticmethod
+    def _write(lines: list[tuple[str, str]]) -> None:
+        grouped: dict[str, list[str]] = dict()
+
+        for path, line in lines:
+            grouped.setdefault(path, list()).append(line)
+
+        for path, chunks in grouped.items():
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("".join(chunks))
+
+    async def _send_digest(self) -> None:
+        if not self._pending and not self.dropped:
+            return
+
+        keys = list(self._pending)[: self.max_embeds]
+        embeds = list()
+
+        for key in keys:
+            report = self._pending.pop(key)
+
+            embed = discord.Embed(color=self.bot.embed_color, title=report.title)
+
+            for name, value in report.fields.items():
+                embed.add_field(name=name, value=value, inline=False)
+
+            embed.add_field(name="Occurrences", value=f"`{report.count}`")
+            embed.add_field(name="Log", value=f"Saved to `{report.path}`")
+            embed.set_footer(text=f"Fingerprint {key}")
+            embed.timestamp = report.first_seen.astimezone()
+
+            embeds.append(embed)
+
+        content = None
+
+        if self.dropped:
+            content = f"{self.dropped} further report(s) were dropped under load."
+            self.dropped = 0
+
+        try:
+            await self.bot.webhook.send(content=content, embeds=embeds)
+
+        except discord.HTTPException as e:
+            self.webhook_failures += 1
+            self.bot.log.error("Failed to send the error digest.", exc_info=e)
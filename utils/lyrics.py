@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional, NamedTuple
+
+import re
+import json
+import time
+import asyncio
+import sqlite3
+import textwrap
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+if TYPE_CHECKING:
+    from lyricsgenius import Genius
+
+
+class Lyrics(NamedTuple):
+    title: str
+    artist: str
+    pages: list[str]
+
+
+def normalize_key(title: str, artist: Optional[str] = "") -> str:
+    def _clean(value: Optional[str]) -> str:
+        value = re.sub(r"[^\w\s]", " ", (value or "").casefold())
+        return " ".join(value.split())
+
+    return f"{_clean(title)}|{_clean(artist)}"
+
+
+class LyricsService:
+    """Genius lookups with a size-bounded SQLite cache of already paged lyrics."""
+
+    def __init__(
+        self,
+        token: str,
+        cache_path: str = "data/lyrics.sqlite3",
+        max_entries: int = 2000,
+        max_workers: int = 2,
+    ):
+        self.max_entries: int = max_entries
+
+        self._token: str = token
+        self._genius: Optional[Genius] = None
+        self._genius_lock: threading.Lock = threading.Lock()
+        self._wrapper: textwrap.TextWrapper = textwrap.TextWrapper(
+            width=750, break_long_words=False, replace_whitespace=False
+        )
+
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="lyrics"
+        )
+        self._inflight: dict[str, asyncio.Task] = dict()
+
+        self._lock: threading.Lock = threading.Lock()
+        self._db: sqlite3.Connection = sqlite3.connect(
+            cache_path, check_same_thread=False
+        )
+        self._db.execute(
+            "create table if not exists lyrics ("
+            "KEY text primary key, TITLE text, ARTIST text, PAGES text, "
+            "ACCESSED_AT real)"
+        )
+        self._db.commit()
+
+    async def search(
+        self, title: str, artist: Optional[str] = ""
+    ) -> Optional[Lyrics]:
+        key = normalize_key(title, artist)
+
+        # Concurrent requests for the same song share a single lookup.
+        if key not in self._inflight:
+            task = asyncio.create_task(self._lookup(key, title, artist))
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            self._inflight[key] = task
+
+        # Shielded so that one cancelled caller doesn't cancel the shared lookup.
+        return await asyncio.shield(self._inflight[key])
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+        with self._lock:
+            self._db.close()
+
+    async def _lookup(
+        self, key: str, title: str, artist: Optional[str]
+    ) -> Optional[Lyrics]:
+        # Cache hits shouldn't queue behind slow Genius requests for the executor.
+        if cached := await asyncio.to_thread(self._get_cached, key):
+            return cached
+
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, self._search, key, title, artist
+        )
+
+    def _search(
+        self, key: str, title: str, artist: Optional[str]
+    ) -> Optional[Lyrics]:
+        song = self._client().search_song(title, artist)
+
+        if not song or not getattr(song, "lyrics", None):
+            return None
+
+        lyrics = Lyrics(
+            title=song.title,
+            artist=song.artist,
+            pages=self._wrapper.wrap(song.lyrics),
+        )
+        self._store(key, lyrics)
+
+        return lyrics
+
+    def _client(self) -> Genius:
+        # lyricsgenius pulls in requests and BeautifulSoup; import it on first use
+        # rather than while the bot starts up.
+        with self._genius_lock:
+            if self._genius is None:
+                from lyricsgenius import Genius
+
+                self._genius = Genius(
+                    self._token,
+                    timeout=10.0,
+                    remove_section_headers=True,
+                    retries=3,
+                )
+
+        return self._genius
+
+    def _get_cached(self, key: str) -> Optional[Lyrics]:
+        with self._lock:
+            row = self._db.execute(
+                "select TITLE, ARTIST, PAGES from lyrics where KEY = ?;", (key,)
+            ).fetchone()
+
+            if not row:
+                return None
+
+            self._db.execute(
+                "update lyrics set ACCESSED_AT = ? where KEY = ?;",
+                (time.time(), key),
+            )
+            self._db.commit()
+
+        return Lyrics(title=row[0], artist=row[1], pages=json.loads(row[2]))
+
+    def _store(self, key: str, lyrics: Lyrics) -> None:
+        with self._lock:
+            self._db.execute(
+                "insert or replace into lyrics values (?, ?, ?, ?, ?);",
+                (
+                    key,
+                    lyrics.title,
+                    lyrics.artist,
+                    json.dumps(lyrics.pages),
+                    time.time(),
+                ),
+            )
+            self._db.execute(
+                "delete from lyrics where KEY not in "
+                "(select KEY from lyrics order by ACCESSED_AT desc limit ?);",
+                (self.max_entries,),
+            )
+            self._db.commit()
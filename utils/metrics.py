@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+from typing import Callable, Iterable, Optional
+
+from aiohttp import web
+
+_DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], **extra: str) -> str:
+    pairs = list(zip(names, values)) + list(extra.items())
+
+    if not pairs:
+        return ""
+
+    return "{" + ",".join(f'{n}="{_escape(str(v))}"' for n, v in pairs) + "}"
+
+
+def _format(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind: str = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        self.name: str = name
+        self.documentation: str = documentation
+        self.labelnames: tuple[str, ...] = tuple(labels)
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+            *self.samples(),
+        ]
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        super().__init__(name, documentation, labels)
+
+        self._values: dict[tuple[str, ...], float] = dict()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def set(self, value: float, **labels: str) -> None:
+        """Set a total that is counted elsewhere, e.g. from a collector."""
+        self._values[self._key(labels)] = value
+
+    def samples(self) -> Iterable[str]:
+        for key, value in self._values.items():
+            yield f"{self.name}{_labels(self.labelnames, key)} {_format(value)}"
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        super().__init__(name, documentation, labels)
+
+        self._values: dict[tuple[str, ...], float] = dict()
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def clear(self) -> None:
+        self._values.clear()
+
+    def samples(self) -> Iterable[str]:
+        for key, value in self._values.items():
+            yield f"{self.name}{_labels(self.labelnames, key)} {_format(value)}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Iterable[str] = (),
+        buckets: Iterable[float] = _DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labels)
+
+        self.buckets: tuple[float, ...] = tuple(sorted(buckets)) + (float("inf"),)
+
+        # Per label set: per-bucket (non-cumulative) counts, then sum.
+        self._values: dict[tuple[str, ...], tuple[list[int], list[float]]] = dict()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+
+        if key not in self._values:
+            self._values[key] = ([0] * len(self.buckets), [0.0])
+
+        counts, total = self._values[key]
+        total[0] += value
+
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[index] += 1
+                break
+
+    def samples(self) -> Iterable[str]:
+        for key, (counts, total) in self._values.items():
+            cumulative = 0
+
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _labels(self.labelnames, key, le=_format(bound))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+
+            labels = _labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format(total[0])}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class Registry:
+    """Holds every metric and renders them in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = dict()
+        self._collectors: list[Callable[[], None]] = list()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(
+        self, name: str, documentation: str, labels: Iterable[str] = ()
+    ) -> Counter:
+        return self._register(Counter(name, documentation, labels))
+
+    def gauge(
+        self, name: str, documentation: str, labels: Iterable[str] = ()
+    ) -> Gauge:
+        return self._register(Gauge(name, documentation, labels))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: Iterable[str] = (),
+        buckets: Iterable[float] = _DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        # Called right before rendering, for gauges that are cheaper to read on
+        # demand (player counts and the like) than to keep up to date.
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+registry = Registry()
+
+# Sampled by the loop watchdog (utils/watchdog.py).
+LOOP_LAG = registry.histogram(
+    "fumetune_event_loop_lag_seconds",
+    "How late the event loop woke up a sleeping task.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+
+
+class MetricsServer:
+    """Serves :data:`registry` on ``/metrics``."""
+
+    def __init__(self, host: str, port: int):
+        self.host: str = host
+        self.port: int = port
+
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+    async def close(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+
+    # noinspection PyUnusedLocal
+    async def _handle(self, request: web.Request) -> web.Response:
+        return web.Response(
+            text=registry.render(), content_type="text/plain", charset="utf-8"
+        )
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from typing import Callable, Iterable, Optional, Awaitable
+
+import asyncio
+
+import wavelink
+
+
+def penalty(
+    stats: Optional[wavelink.StatsResponsePayload], node: wavelink.Node
+) -> float:
+    """Score a node's load from its reported stats; lower is better."""
+    # The usual Lavalink client weighting; frame stats are per minute, out of
+    # 3000 expected, and dominate once a node starts to stutter.
+    if stats is None:
+        return float(len(node.players))
+
+    score = stats.playing
+    score += 1.05 ** (100 * stats.cpu.system_load) * 10 - 10
+
+    if stats.frames:
+        score += 1.03 ** (500 * (stats.frames.deficit / 3000)) * 600 - 600
+        score += (1.03 ** (500 * (stats.frames.nulled / 3000)) * 300 - 300) * 2
+
+    return score
+
+
+class NodeScheduler:
+    """Chooses Lavalink nodes for new connections and failover by reported load."""
+
+    def __init__(self, hysteresis: float = 0.25):
+        self.hysteresis: float = hysteresis
+
+        self._stats: dict[str, wavelink.StatsResponsePayload] = dict()
+        self._placed: dict[str, int] = dict()
+        self._assignments: dict[int, str] = dict()
+
+        self.draining: set[str] = set()
+
+    async def refresh(self) -> None:
+        nodes = [
+            node
+            for node in wavelink.Pool.nodes.values()
+            if node.status is wavelink.NodeStatus.CONNECTED
+        ]
+        results = await asyncio.gather(
+            *(node.fetch_stats() for node in nodes), return_exceptions=True
+        )
+
+        for node, result in zip(nodes, results):
+            if isinstance(result, Exception):
+                self._stats.pop(node.identifier, None)
+            else:
+                self._stats[node.identifier] = result
+
+        self._placed.clear()
+
+    def penalty(self, node: wavelink.Node) -> float:
+        return penalty(self._stats.get(node.identifier), node) + self._placed.get(
+            node.identifier, 0
+        )
+
+    def candidates(self, exclude: Iterable[str] = ()) -> list[wavelink.Node]:
+        exclude = set(exclude)
+
+        return [
+            node
+            for node in wavelink.Pool.nodes.values()
+            if node.status is wavelink.NodeStatus.CONNECTED
+            and node.identifier not in exclude
+            and node.identifier not in self.draining
+        ]
+
+    def choose(
+        self, guild_id: int, exclude: Iterable[str] = ()
+    ) -> Optional[wavelink.Node]:
+        nodes = self.candidates(exclude)
+
+        if not nodes:
+            return None
+
+        scores = {node.identifier: self.penalty(node) for node in nodes}
+        best = min(nodes, key=lambda n: scores[n.identifier])
+
+        # Stay on the previous node unless this one is clearly less loaded, so
+        # guilds don't flap between nodes of similar load.
+        previous = self._assignments.get(guild_id)
+
+        if previous in scores and previous != best.identifier:
+            margin = scores[best.identifier] * (1 + self.hysteresis) + 1
+
+            if scores[previous] <= margin:
+                best = wavelink.Pool.get_node(previous)
+
+        self._assignments[guild_id] = best.identifier
+        # Counted until the next refresh, so a burst of connections is spread out.
+        self._placed[best.identifier] = self._placed.get(best.identifier, 0) + 1
+
+        return best
+
+    async def drain(
+        self,
+        node: wavelink.Node,
+        wave_size: int = 10,
+        interval: float = 5.0,
+        progress: Optional[Callable[[int, int, int], Awaitable[None]]] = None,
+    ) -> tuple[int, int]:
+        """Move every player off ``node`` in waves, returning ``(moved, failed)``."""
+        self.draining.add(node.identifier)
+
+        players = list(node.players.values())
+        moved = failed = 0
+
+        async def _move(player: wavelink.Player) -> bool:
+            target = self.choose(player.guild.id, exclude=(node.identifier,))
+
+            if target is None:
+                return False
+
+            # Resumes the track at the same position, filters, volume and pause
+            # state; the queue and loop flags live on the player and move with it.
+            try:
+                await player.switch_node(target)
+
+            except RuntimeError:
+                # The player may be left half-moved; wavelink advises dropping it.
+                await player.disconnect()
+                return False
+
+            except wavelink.WavelinkException:
+                return False
+
+            return True
+
+        for index in range(0, len(players), wave_size):
+            wave = [
+                player
+                for player in players[index : index + wave_size]
+                if player.connected and player.node is node
+            ]
+            results = await asyncio.gather(
+                *(_move(player) for player in wave), return_exceptions=True
+            )
+
+            # Anything _move did not anticipate counts against this player only.
+            moved += results.count(True)
+            failed += len(results) - results.count(True)
+
+            if progress:
+                await progress(moved, failed, len(players))
+
+            if index + wave_size < len(players):
+                await asyncio.sleep(interval)
+
+        return moved, failed
@@ -2,8 +2,10 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Any, Optional, cast
 
+import math
+
 import discord
-from discord.ext.menus import ListPageSource
+from discord.ext.menus import PageSource, ListPageSource
 
 from utils.config import Config
 
@@ -14,16 +16,34 @@ if TYPE_CHECKING:
     from discord.ext.menus import Menu
 
 
-class QueuePaginatorSource(ListPageSource):
-    def __init__(
-        self, entries: list, ctx: discord.Interaction, per_page: Optional[int] = 5
-    ):
-        super().__init__(entries, per_page=per_page)
+class QueuePaginatorSource(PageSource):
+    """Pages over the live player queue, slicing only the tracks on the page."""
 
+    def __init__(self, ctx: discord.Interaction, per_page: Optional[int] = 5):
         self.ctx: discord.Interaction = ctx
+        self.per_page: int = per_page
+
+    @property
+    def player(self) -> Optional[Player]:
+        return cast(Player, self.ctx.guild.voice_client)
+
+    def get_max_pages(self) -> int:
+        player = self.player
+        count = len(player.queue) if player else 0
+
+        return max(1, math.ceil(count / self.per_page))
+
+    async def get_page(self, page_number: int) -> list:
+        player = self.player
+
+        if not player:
+            return []
+
+        base = page_number * self.per_page
+        return list(enumerate(player.queue[base : base + self.per_page], base + 1))
 
     async def format_page(self, menu: Menu, page: Any) -> discord.Embed:
-        player: Player = cast(Player, self.ctx.guild.voice_client)
+        player = self.player
         channel = player.channel
 
         embed = discord.Embed(color=Config.EMBED_COLOR)
@@ -31,18 +51,13 @@ class QueuePaginatorSource(ListPageSource):
         embed.description = "\n".join(
             f"`{_index}`. **[{_track.title}]({_track.uri})** "
             f"({parse_duration(_track.length)} - "
-            f"{self.ctx.guild.get_member(_track.extras.requester_id).mention})"
+            f"<@{_track.extras.requester_id}>)"
             for _index, _track in page
         )
 
-        total_time = 0
-
-        for track in player.queue:
-            total_time += track.length
-
         embed.set_footer(
             text=f"{len(player.queue)} track(s) in queue | "
-            f"{parse_duration(total_time)} total duration"
+            f"{parse_duration(player.queue.duration)} total duration"
         )
 
         return embed
@@ -1,12 +1,134 @@
 from __future__ import annotations
 
+from typing import Any, Callable, Iterable, Optional, Awaitable
+
+import copy
+import time
 import asyncio
+import itertools
 
 import wavelink
 
 import discord
 
-from utils.tools import parse_duration
+from utils.tools import MAX_TRACK_LENGTH_MS, parse_duration
+from utils.prefetch import Prefetcher, handover, resolve_mirror
+from utils.dispatcher import MessageDispatcher
+
+# Shared by every queue, so a replaced player's queue never repeats a version.
+_versions = itertools.count(1)
+
+
+class Queue(wavelink.Queue):
+    """A queue that keeps a running total of the queued tracks' length."""
+
+    def __init__(self, *, history: bool = True) -> None:
+        super().__init__(history=history)
+
+        self.duration: int = 0
+        # Changes on every mutation, so snapshots can skip unchanged queues
+        # without hashing every track.
+        self.version: int = next(_versions)
+
+    @staticmethod
+    def _length_of(item: Any) -> int:
+        if isinstance(item, wavelink.Playable):
+            return item.length
+
+        return sum(
+            track.length for track in item if isinstance(track, wavelink.Playable)
+        )
+
+    def _recount(self) -> None:
+        # Only for rarer mutations; the common ones adjust the total in place.
+        self.duration = sum(track.length for track in self._items)
+
+    def _changed(self) -> None:
+        self.version = next(_versions)
+
+    def __setitem__(self, index, value, /) -> None:
+        previous = self._items[index]
+        super().__setitem__(index, value)
+        self.duration += value.length - previous.length
+        self._changed()
+
+    def __delitem__(self, index, /) -> None:
+        super().__delitem__(index)
+        self._recount()
+        self._changed()
+
+    def put(self, item, /, *, atomic: bool = True) -> int:
+        added = super().put(item, atomic=atomic)
+        self.duration += self._length_of(item)
+        self._changed()
+
+        return added
+
+    async def put_wait(self, item, /, *, atomic: bool = True) -> int:
+        added = await super().put_wait(item, atomic=atomic)
+        self.duration += self._length_of(item)
+        self._changed()
+
+        return added
+
+    def put_at(self, index: int, value: wavelink.Playable, /) -> None:
+        super().put_at(index, value)
+        self.duration += value.length
+        self._changed()
+
+    def get(self) -> wavelink.Playable:
+        count = len(self._items)
+        track = super().get()
+
+        if len(self._items) == count - 1:
+            self.duration -= track.length
+
+        elif len(self._items) != count:
+            self._recount()
+
+        self._changed()
+
+        return track
+
+    def get_at(self, index: int, /) -> wavelink.Playable:
+        track = super().get_at(index)
+        self.duration -= track.length
+        self._changed()
+
+        return track
+
+    def delete(self, index: int, /) -> None:
+        track = self._items[index]
+        super().delete(index)
+        self.duration -= track.length
+        self._changed()
+
+    def swap(self, first: int, second: int, /) -> None:
+        super().swap(first, second)
+        self._changed()
+
+    def shuffle(self) -> None:
+        super().shuffle()
+        self._changed()
+
+    def remove(self, item: wavelink.Playable, /, count: int | None = 1) -> int:
+        deleted = super().remove(item, count=count)
+        self._recount()
+        self._changed()
+
+        return deleted
+
+    def clear(self) -> None:
+        super().clear()
+        self.duration = 0
+        self._changed()
+
+    def copy(self) -> Queue:
+        queue = Queue(history=self.history is not None)
+        queue._items = self._items.copy()
+        queue.duration = self.duration
+
+        return queue
 
 
 class Player(wavelink.Player):
@@ -17,7 +139,7 @@ class Player(wavelink.Player):
 
         self.dj: discord.Member = self.ctx.user
 
-        self.queue: wavelink.Queue = wavelink.Queue()
+        self.queue: Queue = Queue()
 
         self.waiting: bool = False
         self.loop: bool = False
@@ -29,6 +151,115 @@ class Player(wavelink.Player):
         self.shuffle_votes: set = set()
         self.stop_votes: set = set()
 
+        self.messages: MessageDispatcher = MessageDispatcher(
+            lambda: self.ctx.channel
+        )
+        self.prefetcher: Prefetcher = Prefetcher(self)
+
+        self._enqueuing: set[asyncio.Task] = set()
+
+        self._np_track: Optional[wavelink.Playable] = None
+        self._np_embed: Optional[discord.Embed] = None
+        self._np_view: Optional[discord.ui.View] = None
+
+    def enqueue(
+        self, tracks: Iterable[wavelink.Playable], requester_id: int
+    ) -> bool:
+        """Queue ``tracks`` in one batch, or none of them if any is too long."""
+        extras = wavelink.ExtrasNamespace({"requester_id": requester_id})
+        batch = list()
+
+        for track in tracks:
+            if track.length > MAX_TRACK_LENGTH_MS:
+                return False
+
+            track.extras = extras
+            batch.append(track)
+
+        if batch:
+            self.queue.put(batch)
+
+            if self.playing:
+                self.prefetcher.schedule()
+
+        return True
+
+    async def enqueue_mirrored(
+        self,
+        tracks: list[wavelink.Playable],
+        requester_id: int,
+        progress: Callable[[int, int, bool], Awaitable[None]],
+        batch_size: int = 10,
+        interval: float = 3.0,
+    ) -> None:
+        """Queue mirrored ``tracks`` as they resolve, starting with the first."""
+        extras = wavelink.ExtrasNamespace({"requester_id": requester_id})
+        queued, skipped = await self._enqueue_resolved(tracks[:1], extras)
+
+        await progress(queued, skipped, False)
+
+        # The rest can take minutes; it belongs to the player, not the interaction.
+        task = asyncio.create_task(
+            self._enqueue_rest(
+                tracks[1:], extras, progress, queued, skipped, batch_size, interval
+            )
+        )
+        self._enqueuing.add(task)
+        task.add_done_callback(self._enqueuing.discard)
+
+    async def _enqueue_rest(
+        self,
+        tracks: list[wavelink.Playable],
+        extras: wavelink.ExtrasNamespace,
+        progress: Callable[[int, int, bool], Awaitable[None]],
+        queued: int,
+        skipped: int,
+        batch_size: int,
+        interval: float,
+    ) -> None:
+        reported = time.monotonic()
+
+        for start in range(0, len(tracks), batch_size):
+            if not self.connected:
+                break
+
+            batch = tracks[start : start + batch_size]
+            batch_queued, batch_skipped = await self._enqueue_resolved(batch, extras)
+
+            queued += batch_queued
+            skipped += batch_skipped
+
+            if time.monotonic() - reported >= interval:
+                reported = time.monotonic()
+                await progress(queued, skipped, False)
+
+        await progress(queued, skipped, True)
+
+    async def _enqueue_resolved(
+        self, batch: list[wavelink.Playable], extras: wavelink.ExtrasNamespace
+    ) -> tuple[int, int]:
+        results = await asyncio.gather(
+            *(resolve_mirror(track, node=self.node) for track in batch),
+            return_exceptions=True,
+        )
+        ready = list()
+
+        for track, resolved in zip(batch, results):
+            if (
+                isinstance(resolved, wavelink.Playable)
+                and resolved.length <= MAX_TRACK_LENGTH_MS
+            ):
+                track.extras = extras
+                ready.append(handover(track, resolved))
+
+        if ready:
+            self.queue.put(ready)
+
+            if not self.playing:
+                await self.do_next()
+
+        return len(ready), len(batch) - len(ready)
+
     async def do_next(self):
         if self.playing or self.waiting:
             return
@@ -48,42 +279,70 @@ class Player(wavelink.Player):
         except asyncio.TimeoutError:
             return await self.teardown()
 
-        await self.play(track, volume=100)
+        await self.play(self.prefetcher.take(track), volume=100)
 
         self.waiting = False
 
-        embed, view = self.build_track_embed()
+        self.prefetcher.schedule()
 
-        try:
-            await self.ctx.channel.send(embed=embed, view=view)
+        self.send_now_playing()
 
-        except (discord.Forbidden, discord.errors.Forbidden):
-            return
-
-    def build_track_embed(self):
-        track = self.current
+    def send_now_playing(self) -> None:
+        # Posted once per session, then edited in place for each track.
+        embed, view = self.build_track_embed()
 
-        channel = self.channel
+        self.messages.discard("queue_end")
+        self.messages.post("now_playing", edit=True, embed=embed, view=view)
 
-        embed = discord.Embed(title=f"Now Playing | {channel.name}", colour=0xE44C65)
+    def _build_static_embed(self, track: wavelink.Playable) -> None:
+        embed = discord.Embed(
+            title=f"Now Playing | {self.channel.name}", colour=0xE44C65
+        )
         embed.description = f"```\n{track.title}```\n\n"
 
         if track.artwork:
             embed.set_thumbnail(url=track.artwork)
 
+        requester_id = getattr(track.extras, "requester_id", None)
+
         embed.add_field(name="Author", value=track.author)
         embed.add_field(name="Duration", value=f"`{parse_duration(track.length)}`")
-        embed.add_field(name="Queue Length", value=len(self.queue))
-        embed.add_field(name="Volume", value=f"**`{self.volume}%`**")
+        embed.add_field(name="Queue Length", value="-")
+        embed.add_field(name="Volume", value="-")
         embed.add_field(
             name="Requested By",
-            value=self.ctx.guild.get_member(track.extras.requester_id).mention,
+            value=f"<@{requester_id}>" if requester_id else "Unknown",
         )
 
-        view = discord.ui.View()
+        view = discord.ui.View(timeout=None)
         view.add_item(discord.ui.Button(label="Video Link", url=track.uri))
 
-        return embed, view
+        self._np_track, self._np_embed, self._np_view = track, embed, view
+
+    def build_track_embed(
+        self, *, position: bool = False
+    ) -> tuple[discord.Embed, discord.ui.View]:
+        """The now-playing embed and view for the current track."""
+        # Only the queue length, volume and position change between calls.
+        track = self.current
+
+        if track is not self._np_track:
+            self._build_static_embed(track)
+
+        embed = self._np_embed
+        embed.set_field_at(2, name="Queue Length", value=len(self.queue))
+        embed.set_field_at(3, name="Volume", value=f"**`{self.volume}%`**")
+
+        if position:
+            # Embed.copy() shares the fields with the cached embed.
+            embed = discord.Embed.from_dict(copy.deepcopy(embed.to_dict()))
+            embed.set_field_at(
+                0,
+                name="Position",
+                value=f"`{parse_duration(self.position)}/{parse_duration(track.length)}`",
+            )
+
+        return embed, self._np_view
 
     async def teardown(self):
         self.queue.clear()
@@ -91,5 +350,12 @@ class Player(wavelink.Player):
         self.loop = False
         self.loop_queue = False
 
+        self.messages.close()
+        self.prefetcher.close()
+
+        for task in self._enqueuing:
+            if task is not asyncio.current_task():
+                task.cancel()
+
         await self.stop(force=True)
         await self.disconnect()
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional
+
+import time
+import asyncio
+import logging
+
+import wavelink
+
+from utils.metrics import registry
+
+if TYPE_CHECKING:
+    from utils.player import Player
+
+log = logging.getLogger("fumetune.prefetch")
+
+# Sources lavasrc mirrors onto YouTube when a track is played.
+MIRRORED_SOURCES = frozenset({"spotify", "applemusic", "deezer", "yandexmusic"})
+
+TRANSITION_GAP = registry.histogram(
+    "fumetune_track_transition_seconds",
+    "Time from a track finishing to the next one starting, by whether the next "
+    "track was prefetched.",
+    labels=("prefetched",),
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0),
+)
+
+
+def mirror_queries(track: wavelink.Playable) -> list[str]:
+    # Same order as the lavasrc providers in lavalink/application.example.yml.
+    queries = list()
+
+    if track.isrc:
+        queries.append(f'ytsearch:"{track.isrc}"')
+
+    queries.append(f"ytsearch:{track.title} {track.author}")
+
+    return queries
+
+
+async def resolve_mirror(
+    track: wavelink.Playable, node: Optional[wavelink.Node] = None
+) -> Optional[wavelink.Playable]:
+    """The track lavasrc would play for mirrored ``track``, or ``None``."""
+    for query in mirror_queries(track):
+        results = await wavelink.Pool.fetch_tracks(query, node=node)
+
+        if results and not isinstance(results, wavelink.Playlist):
+            return results[0]
+
+    return None
+
+
+def handover(
+    original: wavelink.Playable, resolved: wavelink.Playable
+) -> wavelink.Playable:
+    """``original`` as shown to users, but playing ``resolved``'s audio."""
+    # Lavalink only reads the encoded track, so the info can stay the mirrored
+    # one's; the new source keeps it from being resolved again if it loops.
+    data = original.raw_data
+
+    track = wavelink.Playable(
+        {
+            "encoded": resolved.encoded,
+            "info": {
+                **data["info"],
+                "length": resolved.length,
+                "sourceName": resolved.source,
+            },
+            "pluginInfo": data.get("pluginInfo", {}),
+            "userData": {},
+        }
+    )
+    track.extras = original.extras
+
+    return track
+
+
+class Prefetcher:
+    """Resolves the next few mirrored tracks in a player's queue ahead of time."""
+
+    def __init__(self, player: Player, depth: int = 3):
+        self.player: Player = player
+        self.depth: int = depth
+
+        self._resolved: dict[str, wavelink.Playable] = dict()
+        self._tasks: dict[str, asyncio.Task] = dict()
+
+        self._ended_at: Optional[float] = None
+        self._prefetched: bool = False
+
+    def schedule(self) -> None:
+        upcoming = {
+            track.encoded: track
+            for track in self.player.queue[: self.depth]
+            if track.source in MIRRORED_SOURCES
+        }
+
+        for encoded in [e for e in self._resolved if e not in upcoming]:
+            del self._resolved[encoded]
+
+        for encoded in [e for e in self._tasks if e not in upcoming]:
+            self._tasks.pop(encoded).cancel()
+
+        for encoded, track in upcoming.items():
+            if encoded not in self._resolved and encoded not in self._tasks:
+                self._tasks[encoded] = asyncio.create_task(self._resolve(track))
+
+    def take(self, track: wavelink.Playable) -> wavelink.Playable:
+        """The track to play for ``track``: its pre-resolved form if there is one."""
+        resolved = self._resolved.pop(track.encoded, None)
+        self._prefetched = resolved is not None
+
+        return handover(track, resolved) if resolved else track
+
+    def track_finished(self) -> None:
+        self._ended_at = time.perf_counter()
+
+    def track_started(self) -> None:
+        if self._ended_at is None:
+            return
+
+        gap = time.perf_counter() - self._ended_at
+        self._ended_at = None
+
+        TRANSITION_GAP.observe(gap, prefetched=str(self._prefetched).lower())
+
+    def close(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+
+        self._tasks.clear()
+        self._resolved.clear()
+
+    async def _resolve(self, track: wavelink.Playable) -> None:
+        try:
+            if resolved := await resolve_mirror(track, node=self.player.node):
+                self._resolved[track.encoded] = resolved
+
+        except wavelink.WavelinkException as e:
+            # Left to lavasrc when the track is played.
+            log.debug(f"Failed to prefetch {track.title!r}: {e!r}")
+
+        finally:
+            if self._tasks.get(track.encoded) is asyncio.current_task():
+                del self._tasks[track.encoded]
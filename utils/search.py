@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from typing import Any
+
+import os
+import json
+import time
+import asyncio
+from urllib.parse import urlsplit, parse_qsl, urlencode, urlunsplit
+
+import wavelink
+
+from utils.cache import TTLCache
+
+_TRACKING_PARAMS = {
+    "si",
+    "pp",
+    "nd",
+    "ref",
+    "gclid",
+    "fbclid",
+    "igshid",
+    "feature",
+    "context",
+    "ref_src",
+}
+
+
+def normalize_query(query: str) -> str:
+    """Reduce a search query or URL to a canonical cache key."""
+    query = query.strip()
+    parts = urlsplit(query)
+
+    if not parts.scheme:
+        return " ".join(query.casefold().split())
+
+    # spotify:track:..., ytsearch:... and the like; their IDs are case-sensitive.
+    if parts.scheme not in ("http", "https") or not parts.netloc:
+        return query
+
+    host = parts.netloc.lower().removeprefix("www.").removeprefix("m.")
+    path = parts.path.rstrip("/")
+    params = [
+        (name, value)
+        for name, value in parse_qsl(parts.query)
+        if name not in _TRACKING_PARAMS and not name.startswith("utm_")
+    ]
+
+    if host == "youtu.be" and path:
+        params.append(("v", path.lstrip("/")))
+        host, path = "youtube.com", "/watch"
+
+    return urlunsplit(("https", host, path, urlencode(sorted(params)), ""))
+
+
+def _serialize(result: wavelink.Search) -> dict[str, Any]:
+    if isinstance(result, wavelink.Playlist):
+        return {
+            "playlist": {
+                "info": {"name": result.name, "selectedTrack": result.selected},
+                "pluginInfo": {
+                    "type": result.type,
+                    "url": result.url,
+                    "artworkUrl": result.artwork,
+                    "author": result.author,
+                },
+                "tracks": [track.raw_data for track in result.tracks],
+            }
+        }
+
+    return {"tracks": [track.raw_data for track in result]}
+
+
+def _deserialize(payload: dict[str, Any]) -> wavelink.Search:
+    # Fresh objects on every hit, so extras stamped on one request's tracks
+    # never leak into another's.
+    if "playlist" in payload:
+        return wavelink.Playlist(payload["playlist"])
+
+    return [wavelink.Playable(data) for data in payload["tracks"]]
+
+
+class SearchCache:
+    """Caches :meth:`wavelink.Playable.search` results across all nodes."""
+
+    def __init__(
+        self,
+        capacity: int,
+        ttl: float,
+        negative_ttl: float,
+        path: str = "data/search-cache.json",
+    ):
+        self.path: str = path
+
+        self._entries: TTLCache = TTLCache(maxsize=capacity, ttl=ttl)
+        self._negative: TTLCache = TTLCache(maxsize=capacity, ttl=negative_ttl)
+
+    async def search(self, query: str) -> wavelink.Search:
+        key = normalize_query(query)
+
+        if self._negative.get(key):
+            return []
+
+        if payload := self._entries.get(key):
+            return _deserialize(payload)
+
+        result = await wavelink.Playable.search(query)
+
+        if not result:
+            self._negative.set(key, True)
+
+        else:
+            # Raw payloads (with the encoded tracks) so save() can persist them.
+            self._entries.set(key, _serialize(result))
+
+        return result
+
+    def stats(self) -> dict[str, Any]:
+        hits = self._entries.hits + self._negative.hits
+        # Every positive lookup first misses the negative cache, so only the
+        # positive cache's misses are real misses.
+        misses = self._entries.misses
+
+        return {
+            "size": len(self._entries),
+            "negative_size": len(self._negative),
+            "hits": hits,
+            "negative_hits": self._negative.hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+        }
+
+    async def save(self) -> None:
+        now = time.time()
+        entries = [
+            [key, value, now + remaining]
+            for key, value, remaining in self._entries.items()
+        ]
+
+        await asyncio.to_thread(self._write, entries)
+
+    async def load(self) -> int:
+        try:
+            entries = await asyncio.to_thread(self._read)
+
+        except FileNotFoundError:
+            return 0
+
+        now = time.time()
+        loaded = 0
+
+        for key, value, expires_at in entries:
+            if expires_at > now:
+                self._entries.set(key, value, ttl=expires_at - now)
+                loaded += 1
+
+        return loaded
+
+    def _write(self, entries: list) -> None:
+        with open(f"{self.path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+
+        os.replace(f"{self.path}.tmp", self.path)
+
+    def _read(self) -> list:
+        with open(self.path, encoding="utf-8") as f:
+            return json.load(f)
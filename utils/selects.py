@@ -5,7 +5,6 @@ from typing import TYPE_CHECKING, Optional, cast
 import discord
 from discord import ui
 
-from .tools import MAX_TRACK_LENGTH_MS
 from .player import Player
 
 if TYPE_CHECKING:
@@ -50,17 +49,13 @@ class TrackSelect(ui.Select):
 
         track = self.tracks[int(self.values[0]) - 1]
 
-        if track.length > MAX_TRACK_LENGTH_MS:
+        if not player.enqueue([track], requester_id=self.ctx.user.id):
             return await self.ctx.edit_original_response(
                 content="The track is too long to be played **(>24 hours)**.",
                 embed=None,
                 view=None,
             )
 
-        track.extras = {"requester_id": self.ctx.user.id}
-
-        await player.queue.put_wait(track)
-
         if not player.playing:
             await player.do_next()
 
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Iterable, Optional, NamedTuple
+
+import os
+import json
+import time
+import asyncio
+
+import wavelink
+
+import discord
+
+if TYPE_CHECKING:
+    from utils.player import Player
+
+
+class RestoredContext(NamedTuple):
+    """What a restored player reads off the interaction it was created by."""
+
+    guild: discord.Guild
+    channel: discord.abc.Messageable
+    user: discord.Member
+
+
+def _dump_track(track: wavelink.Playable) -> list:
+    return [track.raw_data, getattr(track.extras, "requester_id", None)]
+
+
+def load_track(entry: list) -> wavelink.Playable:
+    data, requester_id = entry
+
+    track = wavelink.Playable(data)
+    track.extras = {"requester_id": requester_id}
+
+    return track
+
+
+def resume_position(state: dict[str, Any], heartbeat: float) -> int:
+    """Where to resume the current track, advanced to the last snapshot pass."""
+    position = state["position"]
+
+    if not state["paused"]:
+        position += int(max(0.0, heartbeat - state["at"]) * 1000)
+
+    return min(position, state["current"][0]["info"]["length"])
+
+
+def digest(player: Player) -> int:
+    """Hash everything :func:`capture` records except the position."""
+    current = player.current
+
+    return hash(
+        (
+            player.channel.id,
+            player.ctx.channel.id,
+            player.dj.id,
+            player.loop,
+            player.loop_queue,
+            player.volume,
+            player.paused,
+            current.encoded if current else None,
+            player.queue.version,
+            json.dumps(player.filters(), sort_keys=True),
+        )
+    )
+
+
+def capture(player: Player) -> dict[str, Any]:
+    current = player.current
+
+    return {
+        "channel": player.channel.id,
+        "text": player.ctx.channel.id,
+        "dj": player.dj.id,
+        "loop": player.loop,
+        "loop_queue": player.loop_queue,
+        "volume": player.volume,
+        "paused": player.paused,
+        "filters": player.filters(),
+        "current": _dump_track(current) if current else None,
+        "position": player.position,
+        "at": time.time(),
+        "queue": [_dump_track(track) for track in player.queue],
+    }
+
+
+class SnapshotStore:
+    """An append-only JSON-lines file of player state, one record per guild."""
+
+    def __init__(self, path: str = "data/players.jsonl", compact_ratio: int = 4):
+        self.path: str = path
+        self.compact_ratio: int = compact_ratio
+
+        self.records: dict[int, dict[str, Any]] = dict()
+        self.heartbeat: float = 0.0
+
+        self._digests: dict[int, int] = dict()
+        self._lines: int = 0
+        self._lock: asyncio.Lock = asyncio.Lock()
+
+    async def load(self) -> dict[int, dict[str, Any]]:
+        try:
+            self.records, self.heartbeat = await asyncio.to_thread(self._read)
+
+        except FileNotFoundError:
+            return self.records
+
+        # Rewrite the file straight away, so later appends can't land on the end
+        # of a line torn by a crash.
+        self._lines = await asyncio.to_thread(
+            self._compact, dict(self.records), self.heartbeat
+        )
+
+        return self.records
+
+    async def snapshot(
+        self,
+        players: Iterable[Player],
+        *,
+        keep: Iterable[int] = (),
+        force: bool = False,
+    ) -> int:
+        """Write changed players and tombstone missing ones; returns the record count."""
+        changed: list[tuple[int, Optional[dict[str, Any]]]] = list()
+        seen: set[int] = set()
+
+        for player in players:
+            if not player.connected or not player.channel:
+                continue
+
+            guild_id = player.guild.id
+            seen.add(guild_id)
+
+            value = digest(player)
+
+            if force or self._digests.get(guild_id) != value:
+                self._digests[guild_id] = value
+                self.records[guild_id] = capture(player)
+                changed.append((guild_id, self.records[guild_id]))
+
+        # Guilds in keep (e.g. still waiting to be restored) aren't tombstoned.
+        for guild_id in set(self.records) - seen - set(keep):
+            self._digests.pop(guild_id, None)
+            del self.records[guild_id]
+            changed.append((guild_id, None))
+
+        self.heartbeat = time.time()
+
+        async with self._lock:
+            # Rewrite with only the live records once the file has grown enough.
+            if self._lines + len(changed) > self.compact_ratio * max(
+                len(self.records), 256
+            ):
+                self._lines = await asyncio.to_thread(
+                    self._compact, dict(self.records), self.heartbeat
+                )
+
+            else:
+                await asyncio.to_thread(self._append, changed, self.heartbeat)
+                self._lines += len(changed) + 1
+
+        return len(changed)
+
+    def _append(
+        self, changed: list[tuple[int, Optional[dict[str, Any]]]], heartbeat: float
+    ) -> None:
+        lines = [json.dumps({"guild": g, "state": s}) for g, s in changed]
+        lines.append(json.dumps({"heartbeat": heartbeat}))
+
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def _compact(self, records: dict[int, dict[str, Any]], heartbeat: float) -> int:
+        with open(f"{self.path}.tmp", "w", encoding="utf-8") as f:
+            for guild_id, state in records.items():
+                f.write(json.dumps({"guild": guild_id, "state": state}) + "\n")
+
+            f.write(json.dumps({"heartbeat": heartbeat}) + "\n")
+
+        os.replace(f"{self.path}.tmp", self.path)
+
+        return len(records) + 1
+
+    def _read(self) -> tuple[dict[int, dict[str, Any]], float]:
+        records: dict[int, dict[str, Any]] = dict()
+        heartbeat = 0.0
+
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+
+                except json.JSONDecodeError:
+                    # A line torn by a crash mid-write.
+                    continue
+
+                if "heartbeat" in entry:
+                    heartbeat = entry["heartbeat"]
+
+                elif entry["state"] is None:
+                    records.pop(entry["guild"], None)
+
+                else:
+                    records[entry["guild"]] = entry["state"]
+
+        return records, heartbeat
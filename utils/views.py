@@ -5,7 +5,6 @@ from typing import TYPE_CHECKING, Optional, cast
 import discord
 from discord import ui
 
-from .tools import MAX_TRACK_LENGTH_MS
 from .player import Player
 
 if TYPE_CHECKING:
@@ -75,14 +74,11 @@ class PlaylistConfirm(ui.View):
                 view=None,
             )
 
-        if any(track.length > MAX_TRACK_LENGTH_MS for track in self.playlist.tracks):
+        if not player.enqueue(self.playlist.tracks, requester_id=ctx.user.id):
             return await ctx.edit_original_response(
                 content="Sorry, one or more songs are too long to be played **(>24 hours)**."
             )
 
-        self.playlist.extras = {"requester_id": ctx.user.id}
-        await player.queue.put_wait(self.playlist)
-
         if not player.playing:
             await player.do_next()
 
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+from typing import Optional, NamedTuple
+
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from types import FrameType
+from pathlib import Path
+from datetime import datetime
+from collections import deque
+
+from utils.metrics import LOOP_LAG
+
+_ROOT = Path(__file__).resolve().parents[1]
+
+
+class Stall(NamedTuple):
+    at: datetime
+    duration: float
+    location: Optional[str]
+    cog: Optional[str]
+    command: Optional[str]
+    stack: str
+
+
+def _attribute(
+    frame: FrameType,
+) -> tuple[Optional[str], Optional[str], Optional[str]]:
+    """Find our innermost frame, the cog it ran under and the app command, if any."""
+    location = cog = command = None
+
+    while frame is not None:
+        code = frame.f_code
+        path = Path(code.co_filename)
+
+        if path.is_relative_to(_ROOT) and ".venv" not in path.parts:
+            relative = path.relative_to(_ROOT)
+
+            if location is None:
+                location = f"{relative}:{frame.f_lineno} in {code.co_name}"
+
+            if cog is None and relative.parts[0] == "cogs":
+                cog = relative.stem
+
+        # FumeTree._call holds the interaction being handled.
+        if command is None and code.co_name == "_call":
+            interaction = frame.f_locals.get("interaction")
+
+            if getattr(interaction, "command", None):
+                command = interaction.command.qualified_name
+
+        frame = frame.f_back
+
+    return location, cog, command
+
+
+class LoopWatchdog:
+    """Measures event loop lag and catches whatever is blocking the loop."""
+
+    def __init__(
+        self,
+        threshold: float = 0.25,
+        interval: float = 0.1,
+        max_stalls: int = 50,
+    ):
+        self.threshold: float = threshold
+        self.interval: float = interval
+
+        self.stalls: deque[Stall] = deque(maxlen=max_stalls)
+        self.max_lag: float = 0.0
+
+        self.log: logging.Logger = logging.getLogger("fumetune.watchdog")
+
+        self._beat: float = time.monotonic()
+        self._captured: Optional[tuple[str, tuple]] = None
+        self._lock: threading.Lock = threading.Lock()
+        self._stop: threading.Event = threading.Event()
+
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(
+            target=self._monitor, name="loop-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+        if self._task:
+            self._task.cancel()
+
+    async def _heartbeat(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - start - self.interval)
+
+            self._beat = time.monotonic()
+            LOOP_LAG.observe(lag)
+
+            if lag >= self.threshold:
+                self._report(lag)
+
+    def _monitor(self) -> None:
+        while not self._stop.wait(self.interval / 2):
+            overdue = time.monotonic() - self._beat - self.interval
+
+            if overdue < self.threshold:
+                continue
+
+            # Grab the loop thread's stack while the blocking call is still running.
+            with self._lock:
+                if self._captured is not None:
+                    continue
+
+                frame = sys._current_frames().get(self._loop_thread_id)
+
+                if frame is None:
+                    continue
+
+                stack = "".join(traceback.format_stack(frame, limit=25))
+                self._captured = (stack, _attribute(frame))
+
+    def _report(self, lag: float) -> None:
+        with self._lock:
+            captured, self._captured = self._captured, None
+
+        self.max_lag = max(self.max_lag, lag)
+
+        if captured is None:
+            # Too short for the monitor thread to catch in the act.
+            stack, (location, cog, command) = "", (None, None, None)
+
+        else:
+            stack, (location, cog, command) = captured
+
+        self.stalls.append(
+            Stall(
+                at=datetime.now(),
+                duration=lag,
+                location=location,
+                cog=cog,
+                command=command,
+                stack=stack,
+            )
+        )
+        self.log.warning(
+            f"Event loop blocked for {lag:.3f}s at {location or 'an unknown location'}"
+            f" (cog: {cog or '-'}, command: {command or '-'})"
+            + (f"\n{stack}" if stack else "")
+        )